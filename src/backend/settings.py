@@ -26,9 +26,11 @@ THIRD_PARTY_APPS = [
     "django_filters",
     "corsheaders",
     "drf_spectacular",
+    "django_celery_beat",
 ]
 
 LOCAL_APPS = [
+    "common",
     "content",
 ]
 
@@ -36,6 +38,8 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 # Middleware configuration
 MIDDLEWARE = [
+    "common.middleware.RequestProfilingMiddleware",
+    "common.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -70,6 +74,19 @@ TEMPLATES = [
 # Database configuration
 DATABASES = {"default": env.db("DATABASE_URI")}
 
+# Cache configuration (e.g. CACHE_URL=rediscache://redis:6379/1)
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
+# Cache alias and lifetime (seconds) of cached API list/retrieve responses
+API_CACHE_ALIAS = "default"
+API_CACHE_TIMEOUT = env.int("API_CACHE_TIMEOUT", default=300)
+
+# Rows fetched per server-side cursor round trip by the export endpoints
+EXPORT_CHUNK_SIZE = env.int("EXPORT_CHUNK_SIZE", default=2000)
+
+# Maximum number of objects written by one bulk create/update/delete request
+BULK_WRITE_MAX_ITEMS = env.int("BULK_WRITE_MAX_ITEMS", default=10000)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -95,6 +112,14 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # External user ID
 DEFAULT_EXTERNAL_USER_ID = 99999942
 
+# Number of API items diffed and written per transaction during sync.
+# Leave unset to synchronize everything in a single transaction; streamed
+# responses are still written in batches, and upserts split into statements,
+# of BaseSyncService.stream_batch_size.
+SYNC_BATCH_SIZE = env.int("SYNC_BATCH_SIZE", default=None)
+# "diff" compares stored hashes before writing, "upsert" uses INSERT ON CONFLICT.
+SYNC_WRITE_STRATEGY = env("SYNC_WRITE_STRATEGY", default="diff")
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = env.list("CORS_ALLOWED_ORIGINS", default=[])
 CORS_ALLOW_CREDENTIALS = True
@@ -102,19 +127,53 @@ CORS_ALLOW_CREDENTIALS = True
 # Django REST Framework settings
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # Session first, so unauthenticated requests keep getting a 403.
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "rest_framework.authentication.SessionAuthentication",
+        "rest_framework.authentication.BasicAuthentication",
+        "rest_framework_simplejwt.authentication.JWTAuthentication",
+    ],
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
-        "rest_framework.filters.SearchFilter",
+        "common.filters.FullTextSearchFilter",
         "rest_framework.filters.OrderingFilter",
     ],
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "common.renderers.ORJSONRenderer",
         "rest_framework.renderers.BrowsableAPIRenderer",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "common.pagination.ApproximateCountPagination",
     "PAGE_SIZE": 10,
 }
 
+# Request profiling: share of requests measured, Server-Timing header and
+# thresholds from which a request is logged. The header exposes query counts
+# and timings to any client, so it is off unless enabled.
+REQUEST_PROFILING_SAMPLE_RATE = env.float("REQUEST_PROFILING_SAMPLE_RATE", default=0.1)
+REQUEST_PROFILING_SERVER_TIMING = env.bool(
+    "REQUEST_PROFILING_SERVER_TIMING", default=False
+)
+REQUEST_PROFILING_SLOW_MS = env.float("REQUEST_PROFILING_SLOW_MS", default=500)
+REQUEST_PROFILING_MAX_QUERIES = env.int("REQUEST_PROFILING_MAX_QUERIES", default=50)
+# Executions of one statement within a request reported as N+1 queries
+REQUEST_PROFILING_DUPLICATE_QUERIES = env.int(
+    "REQUEST_PROFILING_DUPLICATE_QUERIES", default=10
+)
+REQUEST_PROFILING_RAISE_ON_DUPLICATES = env.bool(
+    "REQUEST_PROFILING_RAISE_ON_DUPLICATES", default=False
+)
+
+# Bearer token of the Prometheus scraper on /metrics/; without it only staff
+# sessions can read the metrics.
+METRICS_AUTH_TOKEN = env.str("METRICS_AUTH_TOKEN", default=None)
+
+# Days sync runs are kept for; older runs are deleted when a run is recorded,
+# which bounds the aggregates run by every /metrics/ scrape.
+SYNC_RUN_RETENTION_DAYS = env.int("SYNC_RUN_RETENTION_DAYS", default=30)
+
+# Row estimate from which paginated lists report an approximate count
+APPROXIMATE_COUNT_THRESHOLD = env.int("APPROXIMATE_COUNT_THRESHOLD", default=10000)
+
 # Spectacular settings
 SPECTACULAR_SETTINGS = {
     "TITLE": "Django REST API",
@@ -122,12 +181,24 @@ SPECTACULAR_SETTINGS = {
     "VERSION": "1.0.0",
 }
 
-# Celery settings (optional)
+# Celery settings (optional). The scheduled synchronization needs a result
+# backend for its chords, and a shared CACHE_URL for its lock, unless eager.
 CELERY_BROKER_URL = env("CELERY_BROKER_URL", default=None)
 CELERY_RESULT_BACKEND = env("CELERY_RESULT_BACKEND", default=None)
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+CELERY_TASK_ALWAYS_EAGER = env.bool("CELERY_TASK_ALWAYS_EAGER", default=False)
+CELERY_BEAT_SCHEDULE = {
+    "synchronize-external-content": {
+        "task": "content.tasks.synchronize_external_content_task",
+        "schedule": env.int("SYNC_SCHEDULE_SECONDS", default=3600),
+    },
+}
+
+# Items per chunk task and lock lifetime of the scheduled synchronization
+SYNC_CHUNK_SIZE = env.int("SYNC_CHUNK_SIZE", default=1000)
+SYNC_LOCK_TIMEOUT = env.int("SYNC_LOCK_TIMEOUT", default=60 * 60)
 
 # Logging configuration
 LOGGING = {
@@ -1,3 +1,24 @@
+import os
+import tempfile
+
 from backend.settings import *  # noqa: F401,F403
 
 DATABASES = {"default": env.db("DATABASE_URI")}
+
+# A cache shared across processes, as API response caching requires.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(tempfile.gettempdir(), "backend-test-cache"),
+    }
+}
+
+CELERY_BROKER_URL = "memory://"
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_TASK_EAGER_PROPAGATES = True
+
+# Profile every request, report it in Server-Timing and fail tests on N+1
+# queries.
+REQUEST_PROFILING_SAMPLE_RATE = 1.0
+REQUEST_PROFILING_SERVER_TIMING = True
+REQUEST_PROFILING_RAISE_ON_DUPLICATES = True
@@ -3,17 +3,21 @@ from django.urls import include, path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from common.views import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("schema/", SpectacularAPIView.as_view(), name="schema"),
     path("docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
+    path("metrics/", metrics_view, name="metrics"),
     path(
         "api/v1/",
         include(
             [
                 path("content/", include("content.urls")),
+                path("sync/", include("common.urls")),
             ]
         ),
     ),
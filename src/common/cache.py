@@ -0,0 +1,72 @@
+import hashlib
+import time
+from typing import Type
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import models
+
+
+def get_api_cache() -> BaseCache:
+    """
+    Return the cache backend used for API responses and their versions.
+    """
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def is_shared_cache(cache: BaseCache) -> bool:
+    """
+    Return whether a cache is shared by every process, unlike the in-memory
+    and dummy backends.
+    """
+    return not isinstance(cache, (LocMemCache, DummyCache))
+
+
+def api_cache_is_shared() -> bool:
+    """
+    Return whether API responses can be cached: their versions are only
+    bumped in the process that writes, so other processes must see them.
+    """
+    return is_shared_cache(get_api_cache())
+
+
+def _version_key(model: Type[models.Model]) -> str:
+    return f"api-version:{model._meta.label_lower}"
+
+
+def get_cache_version(model: Type[models.Model]) -> int:
+    """
+    Return the current cache version of a model's API responses.
+
+    Missing versions start from the current time, so a version evicted from
+    the cache never falls back to a value used by older cached responses.
+    """
+    cache = get_api_cache()
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_cache_version(model: Type[models.Model]) -> None:
+    """
+    Invalidate every cached API response that depends on a model.
+    """
+    cache = get_api_cache()
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def make_response_cache_key(prefix: str, *parts: object) -> str:
+    """
+    Build a bounded-length cache key from arbitrary parts.
+    """
+    digest = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+    return f"api-response:{prefix}:{digest}"
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from common.cache import api_cache_is_shared
+
+
+@register(Tags.caches)
+def check_api_cache(app_configs, **kwargs):
+    """
+    Warn that API responses are not cached when the cache is process-local.
+    """
+    if settings.API_CACHE_TIMEOUT and not api_cache_is_shared():
+        return [
+            Warning(
+                "API responses are not cached: the API cache is local to each "
+                "process, so writes in other processes could not invalidate it.",
+                hint="Set CACHE_URL to a shared backend, e.g. "
+                "rediscache://redis:6379/1.",
+                id="common.W001",
+            )
+        ]
+    return []
@@ -0,0 +1,61 @@
+from typing import Optional
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+from rest_framework.filters import BaseFilterBackend
+
+from common.models import SEARCH_CONFIG
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Filter by a full-text `?search=` query against the view's
+    `search_vector_field`, ordering the best ranked matches first.
+
+    Queries follow the `websearch_to_tsquery` syntax (quoted phrases, `or`,
+    `-word`) and are matched with the `@@` operator, served by a GIN index on
+    the vector column. Views without `search_vector_field` are not filtered.
+    """
+
+    search_param = "search"
+    search_title = "Search"
+    search_description = "A full-text search query."
+
+    def get_search_query(self, request) -> Optional[SearchQuery]:
+        """
+        Return the search query of the request, if any.
+        """
+        term = request.query_params.get(self.search_param, "").strip()
+        if not term:
+            return None
+        return SearchQuery(term, search_type="websearch", config=SEARCH_CONFIG)
+
+    def filter_queryset(self, request, queryset, view):
+        """
+        Keep the rows matching the search query, best ranked first.
+        """
+        field = getattr(view, "search_vector_field", None)
+        query = self.get_search_query(request)
+        if field is None or query is None:
+            return queryset
+        return (
+            queryset.filter(**{field: query})
+            .annotate(search_rank=SearchRank(F(field), query))
+            .order_by("-search_rank", *queryset.query.order_by)
+        )
+
+    def get_schema_operation_parameters(self, view):
+        """
+        Document the search parameter of views with a search vector.
+        """
+        if getattr(view, "search_vector_field", None) is None:
+            return []
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": self.search_description,
+                "schema": {"type": "string"},
+            }
+        ]
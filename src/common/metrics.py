@@ -0,0 +1,161 @@
+import os
+from typing import Iterator
+
+from django.db.models import Count, Max
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily, Metric
+
+from common.models import SyncRun
+
+# Under gunicorn, PROMETHEUS_MULTIPROC_DIR makes every worker write its
+# samples to memory-mapped files of that directory (see gunicorn.conf.py).
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Duration of HTTP requests by view, action, method and status.",
+    ["view", "action", "method", "status"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries run per HTTP request.",
+    ["view", "action"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200, float("inf")),
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in database queries per HTTP request.",
+    ["view", "action"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests",
+    "Lookups of the API caches by result (hit or miss).",
+    ["cache", "result"],
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """
+    Count a lookup of `cache`, for hit ratios.
+    """
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    Return a registry with the metrics of every worker process (or of this
+    process outside multiprocess mode) and the sync run metrics.
+    """
+    registry = CollectorRegistry()
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(REGISTRY)
+    registry.register(SyncRunCollector())
+    return registry
+
+
+class SyncRunCollector:
+    """
+    Collector reading the sync run metrics from the database on every scrape.
+
+    Runs are recorded by Celery workers and commands, outside the processes
+    serving /metrics/, so their metrics cannot be kept in process counters.
+    The scrape cost is bounded by the `SYNC_RUN_RETENTION_DAYS` pruning.
+    """
+
+    def collect(self) -> Iterator[Metric]:
+        totals = (
+            SyncRun.objects.values("resource", "method", "outcome")
+            .annotate(count=Count("pk"))
+            .order_by("resource", "method", "outcome")
+        )
+        last_successes = (
+            SyncRun.objects.exclude(outcome=SyncRun.Outcome.FAILED)
+            .values("resource", "method")
+            .annotate(finished_at=Max("finished_at"))
+            .order_by("resource", "method")
+        )
+        latest_runs = list(
+            SyncRun.objects.order_by("resource", "method", "-started_at")
+            .distinct("resource", "method")
+            .values()
+        )
+        labels = ["resource", "method"]
+
+        runs = GaugeMetricFamily(
+            "sync_runs",
+            "Recorded synchronization runs by outcome.",
+            labels=[*labels, "outcome"],
+        )
+        for row in totals:
+            runs.add_metric(
+                [row["resource"], row["method"], row["outcome"]], row["count"]
+            )
+        yield runs
+
+        last_success = GaugeMetricFamily(
+            "sync_last_success_timestamp_seconds",
+            "End time of the latest successful run.",
+            labels=labels,
+        )
+        for row in last_successes:
+            last_success.add_metric(
+                [row["resource"], row["method"]], row["finished_at"].timestamp()
+            )
+        yield last_success
+
+        families = {
+            "timestamp": GaugeMetricFamily(
+                "sync_last_run_timestamp_seconds",
+                "End time of the latest run.",
+                labels=labels,
+            ),
+            "success": GaugeMetricFamily(
+                "sync_last_run_success",
+                "Whether the latest run succeeded (1) or failed (0).",
+                labels=labels,
+            ),
+            "duration": GaugeMetricFamily(
+                "sync_last_run_duration_seconds",
+                "Duration of the latest run, in total and by phase.",
+                labels=[*labels, "phase"],
+            ),
+            "items": GaugeMetricFamily(
+                "sync_last_run_items",
+                "Items fetched, inserted and updated by the latest run.",
+                labels=[*labels, "kind"],
+            ),
+            "bytes": GaugeMetricFamily(
+                "sync_last_run_downloaded_bytes",
+                "Size of the API responses of the latest run.",
+                labels=labels,
+            ),
+            "queries": GaugeMetricFamily(
+                "sync_last_run_queries",
+                "Database queries of the latest run.",
+                labels=labels,
+            ),
+        }
+        for run in latest_runs:
+            run_labels = [run["resource"], run["method"]]
+            families["timestamp"].add_metric(run_labels, run["finished_at"].timestamp())
+            families["success"].add_metric(
+                run_labels, int(run["outcome"] != SyncRun.Outcome.FAILED)
+            )
+            for phase, field in (
+                ("total", "duration_seconds"),
+                ("fetch", "fetch_seconds"),
+                ("diff", "diff_seconds"),
+                ("write", "write_seconds"),
+            ):
+                families["duration"].add_metric([*run_labels, phase], run[field])
+            for kind in ("fetched", "inserted", "updated"):
+                families["items"].add_metric([*run_labels, kind], run[f"{kind}_count"])
+            families["bytes"].add_metric(run_labels, run["downloaded_bytes"])
+            families["queries"].add_metric(run_labels, run["query_count"])
+        yield from families.values()
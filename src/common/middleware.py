@@ -0,0 +1,220 @@
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpRequest, HttpResponse
+
+from common.metrics import REQUEST_DB_DURATION, REQUEST_DB_QUERIES, REQUEST_DURATION
+from common.queries import QueryCounter
+
+logger = logging.getLogger(__name__)
+
+
+class DuplicateQueriesError(Exception):
+    """
+    Raised when a request repeats the same SQL statement, as N+1 queries do,
+    and `REQUEST_PROFILING_RAISE_ON_DUPLICATES` is enabled.
+    """
+
+
+class RequestProfile(QueryCounter):
+    """
+    Query count, SQL time, repeated statements and phase durations of a
+    single request.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.statements: Counter = Counter()
+        self.phases: Dict[str, float] = {}
+
+    def observe(self, sql: str) -> None:
+        self.statements[sql] += 1
+
+    def most_repeated(self) -> Optional[Tuple[str, int]]:
+        """
+        Return the `(sql, count)` of the most repeated statement, if any.
+        """
+        common = self.statements.most_common(1)
+        return common[0] if common else None
+
+
+@contextmanager
+def profile_phase(request, name: str) -> Iterator[None]:
+    """
+    Record the duration of a block as phase `name` of a profiled request.
+    Does nothing when the request is not sampled.
+    """
+    profile: Optional[RequestProfile] = getattr(request, "request_profile", None)
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.phases[name] = time.perf_counter() - started
+
+
+class RequestProfilingMiddleware:
+    """
+    Measure the queries, SQL time, view and rendering time of a sample of
+    requests (`REQUEST_PROFILING_SAMPLE_RATE`).
+
+    Sampled responses carry a `Server-Timing` header. Requests slower than
+    `REQUEST_PROFILING_SLOW_MS`, running more than
+    `REQUEST_PROFILING_MAX_QUERIES` queries, or repeating one statement
+    `REQUEST_PROFILING_DUPLICATE_QUERIES` times are logged as JSON; with
+    `REQUEST_PROFILING_RAISE_ON_DUPLICATES` the latter raise instead.
+
+    The body of streaming responses is produced after the middleware
+    returns, so its queries are not counted.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if random.random() >= settings.REQUEST_PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        request.request_profile = profile
+        started = time.perf_counter()
+        with connection.execute_wrapper(profile):
+            response = self.get_response(request)
+        finished = time.perf_counter()
+        if "view" not in profile.phases and hasattr(request, "_view_started"):
+            profile.phases["view"] = finished - request._view_started
+        profile.phases["total"] = finished - started
+
+        if settings.REQUEST_PROFILING_SERVER_TIMING:
+            response["Server-Timing"] = self.server_timing(profile)
+        self.check(request, response, profile)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs) -> None:
+        if hasattr(request, "request_profile"):
+            request._view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns.
+        if hasattr(request, "_view_started"):
+            profile = request.request_profile
+            profile.phases["view"] = time.perf_counter() - request._view_started
+            render_started = time.perf_counter()
+
+            def rendered(response) -> None:
+                profile.phases["render"] = time.perf_counter() - render_started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    @staticmethod
+    def server_timing(profile: RequestProfile) -> str:
+        """
+        Return the `Server-Timing` header value of a profile.
+        """
+        metrics = [
+            f'db;dur={profile.seconds * 1000:.1f};desc="{profile.count} queries"'
+        ]
+        for name in ("auth", "view", "render", "total"):
+            if name in profile.phases:
+                metrics.append(f"{name};dur={profile.phases[name] * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def check(
+        self, request: HttpRequest, response: HttpResponse, profile: RequestProfile
+    ) -> None:
+        """
+        Log the profile of a request exceeding a threshold, and raise on
+        repeated statements when configured to.
+        """
+        sql, repeated = profile.most_repeated() or (None, 0)
+        duplicates = repeated >= settings.REQUEST_PROFILING_DUPLICATE_QUERIES
+        if duplicates and settings.REQUEST_PROFILING_RAISE_ON_DUPLICATES:
+            raise DuplicateQueriesError(
+                f"{request.method} {request.path} ran the same query {repeated} "
+                f"times (N+1?): {sql}"
+            )
+
+        slow = profile.phases["total"] * 1000 >= settings.REQUEST_PROFILING_SLOW_MS
+        many = profile.count > settings.REQUEST_PROFILING_MAX_QUERIES
+        if not (slow or many or duplicates):
+            return
+        record: Dict[str, Any] = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": profile.count,
+            "sql_ms": round(profile.seconds * 1000, 1),
+            **{
+                f"{name}_ms": round(seconds * 1000, 1)
+                for name, seconds in profile.phases.items()
+            },
+            "slow": slow,
+            "too_many_queries": many,
+        }
+        if duplicates:
+            record["repeated_query"] = {"sql": sql, "count": repeated}
+        logger.warning(
+            "request_profile %s", json.dumps(record), extra={"profile": record}
+        )
+
+
+class MetricsMiddleware:
+    """
+    Observe the duration, query count and SQL time of every request in the
+    Prometheus histograms of `common.metrics`.
+
+    Requests are labeled by view class and viewset action (the HTTP method
+    for other views) rather than by path, to bound the number of series.
+    Streaming responses are observed when their headers are ready.
+
+    Placed after RequestProfilingMiddleware, sampled requests reuse the
+    query counts of their profile instead of wrapping queries twice.
+    """
+
+    methods = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        queries: Optional[QueryCounter] = getattr(request, "request_profile", None)
+        started = time.perf_counter()
+        if queries is not None:
+            response = self.get_response(request)
+        else:
+            queries = QueryCounter()
+            with connection.execute_wrapper(queries):
+                response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        method = request.method if request.method in self.methods else "other"
+        view, action = self.view_labels(request, method.lower())
+        REQUEST_DURATION.labels(
+            view, action, method, str(response.status_code)
+        ).observe(duration)
+        REQUEST_DB_QUERIES.labels(view, action).observe(queries.count)
+        REQUEST_DB_DURATION.labels(view, action).observe(queries.seconds)
+        return response
+
+    @staticmethod
+    def view_labels(request: HttpRequest, method: str) -> Tuple[str, str]:
+        """
+        Return the `(view, action)` labels of a request.
+        """
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return "unresolved", method
+        view_class = getattr(match.func, "cls", None)
+        view = view_class.__name__ if view_class else match.view_name
+        actions = getattr(match.func, "actions", None) or {}
+        return view, actions.get(method, method)
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("resource", models.CharField(max_length=100)),
+                ("method", models.CharField(max_length=20)),
+                ("write_strategy", models.CharField(max_length=20)),
+                ("started_at", models.DateTimeField()),
+                ("finished_at", models.DateTimeField()),
+                ("duration_seconds", models.FloatField()),
+                ("fetch_seconds", models.FloatField(default=0)),
+                ("diff_seconds", models.FloatField(default=0)),
+                ("write_seconds", models.FloatField(default=0)),
+                ("fetched_count", models.PositiveIntegerField(default=0)),
+                ("inserted_count", models.PositiveIntegerField(default=0)),
+                ("updated_count", models.PositiveIntegerField(default=0)),
+                ("downloaded_bytes", models.PositiveBigIntegerField(default=0)),
+                ("query_count", models.PositiveIntegerField(default=0)),
+                (
+                    "outcome",
+                    models.CharField(
+                        choices=[
+                            ("success", "Success"),
+                            ("not_modified", "Not Modified"),
+                            ("failed", "Failed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("error", models.TextField(blank=True, default="")),
+            ],
+            options={
+                "ordering": ["-started_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["resource", "method", "-started_at"],
+                        name="common_syncrun_latest_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0001_sync_runs"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApiValidators",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("url", models.URLField(max_length=500, unique=True)),
+                ("etag", models.CharField(blank=True, max_length=255, null=True)),
+                (
+                    "last_modified",
+                    models.CharField(blank=True, max_length=64, null=True),
+                ),
+                ("digest", models.CharField(blank=True, max_length=64, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
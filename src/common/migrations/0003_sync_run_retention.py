@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-18 17:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0002_api_validators"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="syncrun",
+            index=models.Index(
+                fields=["started_at"], name="common_syncrun_started_idx"
+            ),
+        ),
+    ]
@@ -1,26 +1,168 @@
+import hashlib
+import json
+from typing import Any, Dict
+
 from django.db import models
 
+# Text search configuration of the search vectors and search queries.
+SEARCH_CONFIG = "english"
+
+
+def compute_content_hash(fields: Dict[str, Any]) -> str:
+    """
+    Return a stable SHA-256 hex digest of a field name -> value mapping.
+    """
+    payload = json.dumps(fields, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
 
 class BaseAppModel(models.Model):
     """
     Base model with timestamps and simple serialization.
+
+    Subclasses list the fields kept in sync with an external source in
+    `hash_fields`; their fingerprint is stored in `content_hash` on save.
     """
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    content_hash = models.CharField(
+        max_length=64, blank=True, default="", db_index=True, editable=False
+    )
+
+    hash_fields: tuple[str, ...] = ()
 
     class Meta:
         abstract = True
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["created_at"], name="%(app_label)s_%(class)s_created_idx"
+            ),
+        ]
 
     def as_field_dict(self, include: list[str] | None = None) -> dict:
         """
         Return a dict of model field values for comparison or serialization.
-        By default includes all concrete fields except PK/timestamps.
+        By default includes all concrete fields except PK/timestamps/hash
+        and generated fields.
         """
         fields = include or [
             f.name
             for f in self._meta.fields
-            if f.name not in ("id", "created_at", "updated_at")
+            if f.name not in ("id", "created_at", "updated_at", "content_hash")
+            and not f.generated
         ]
         return {f: getattr(self, f) for f in fields}
+
+    def refresh_content_hash(self) -> None:
+        """
+        Recompute `content_hash` from the current values of `hash_fields`.
+        """
+        if self.hash_fields:
+            self.content_hash = compute_content_hash(
+                self.as_field_dict(include=list(self.hash_fields))
+            )
+
+    def save(self, *args, **kwargs) -> None:
+        """
+        Keep `content_hash` up to date on every save.
+        """
+        self.refresh_content_hash()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "content_hash"}
+        super().save(*args, **kwargs)
+
+
+class SyncRun(models.Model):
+    """
+    A run of a synchronization service.
+
+    Attributes:
+        resource (CharField): Label of the synchronized model, e.g. `content.post`.
+        method (CharField): `synchronize`, `page` (one chunk) or `bulk_load`.
+        write_strategy (CharField): Write strategy of the service.
+        started_at (DateTimeField): When the run started.
+        finished_at (DateTimeField): When the run finished.
+        duration_seconds (FloatField): Wall time of the run.
+        fetch_seconds (FloatField): Time spent waiting for API items.
+        diff_seconds (FloatField): Time spent mapping items and comparing them
+            with the stored rows.
+        write_seconds (FloatField): Time spent writing and committing batches.
+        fetched_count (PositiveIntegerField): API items fetched.
+        inserted_count (PositiveIntegerField): Rows inserted.
+        updated_count (PositiveIntegerField): Rows updated.
+        downloaded_bytes (PositiveBigIntegerField): Size of the API responses.
+        query_count (PositiveIntegerField): Database queries run.
+        outcome (CharField): `success`, `not_modified` or `failed`.
+        error (TextField): The exception of a failed run.
+    """
+
+    class Outcome(models.TextChoices):
+        SUCCESS = "success"
+        NOT_MODIFIED = "not_modified"
+        FAILED = "failed"
+
+    resource = models.CharField(max_length=100)
+    method = models.CharField(max_length=20)
+    write_strategy = models.CharField(max_length=20)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    duration_seconds = models.FloatField()
+    fetch_seconds = models.FloatField(default=0)
+    diff_seconds = models.FloatField(default=0)
+    write_seconds = models.FloatField(default=0)
+    fetched_count = models.PositiveIntegerField(default=0)
+    inserted_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    downloaded_bytes = models.PositiveBigIntegerField(default=0)
+    query_count = models.PositiveIntegerField(default=0)
+    outcome = models.CharField(max_length=20, choices=Outcome.choices)
+    error = models.TextField(blank=True, default="")
+
+    class Meta:
+        ordering = ["-started_at"]
+        indexes = [
+            # Latest runs of a resource.
+            models.Index(
+                fields=["resource", "method", "-started_at"],
+                name="common_syncrun_latest_idx",
+            ),
+            # Runs past the retention period.
+            models.Index(fields=["started_at"], name="common_syncrun_started_idx"),
+        ]
+
+    def __str__(self) -> str:
+        """
+        Return a string representation of the SyncRun.
+        """
+        return f"SyncRun({self.id}): {self.resource} {self.outcome}"
+
+
+class ApiValidators(models.Model):
+    """
+    Validators of the last synchronized response of an API endpoint.
+
+    They are stored in the database, so that every process and worker sends
+    the same conditional requests.
+
+    Attributes:
+        url (URLField): The endpoint URL.
+        etag (CharField): `ETag` header of the response.
+        last_modified (CharField): `Last-Modified` header of the response.
+        digest (CharField): SHA-256 of the response body, when it was read.
+        updated_at (DateTimeField): When the validators were saved.
+    """
+
+    url = models.URLField(max_length=500, unique=True)
+    etag = models.CharField(max_length=255, blank=True, null=True)
+    last_modified = models.CharField(max_length=64, blank=True, null=True)
+    digest = models.CharField(max_length=64, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        """
+        Return a string representation of the ApiValidators.
+        """
+        return f"ApiValidators({self.id}): {self.url}"
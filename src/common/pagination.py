@@ -0,0 +1,320 @@
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Tuple, Type
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Model, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """
+    Return PostgreSQL's row estimate for a queryset, or None if unavailable.
+
+    Unfiltered querysets use the table statistics in `pg_class.reltuples`,
+    others the row estimate of the query plan.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    query = queryset.query
+    with connection.cursor() as cursor:
+        if not query.where and not query.distinct and not query.is_sliced:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # -1 means the table was never vacuumed nor analyzed.
+            return row[0] if row and row[0] >= 0 else None
+
+        sql, params = queryset.order_by().query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class ApproximatePage(Page):
+    """
+    Page of an approximately counted list, knowing whether a next page
+    exists from the extra row read past it.
+    """
+
+    def __init__(self, object_list, number, paginator, has_next: bool) -> None:
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Paginator using PostgreSQL's row estimate as its count when it is at
+    least `threshold`, and an exact `COUNT(*)` otherwise.
+
+    An estimate may be too low, so it never bounds the pages: any page
+    number is valid, and pages read one extra row to know if they are last.
+    """
+
+    def __init__(self, *args, threshold: int, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.threshold = threshold
+        self.count_is_approximate = False
+
+    def validate_number(self, number):
+        """
+        Validate a page number against the count only when it is exact.
+        """
+        self.count  # Sets count_is_approximate.
+        if not self.count_is_approximate:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number):
+        """
+        Return a page, reading `per_page + 1` rows when the count is estimated.
+        """
+        number = self.validate_number(number)
+        if not self.count_is_approximate:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        return ApproximatePage(
+            rows[: self.per_page], number, self, has_next=len(rows) > self.per_page
+        )
+
+    @cached_property
+    def count(self) -> int:
+        """
+        Return the total number of objects, possibly estimated.
+        """
+        if isinstance(self.object_list, QuerySet):
+            estimate = estimate_count(self.object_list)
+            if estimate is not None and estimate >= self.threshold:
+                self.count_is_approximate = True
+                return estimate
+        return super().count
+
+
+class ApproximateCountPagination(PageNumberPagination):
+    """
+    Page number pagination that avoids `COUNT(*)` on large result sets.
+
+    When PostgreSQL estimates at least `settings.APPROXIMATE_COUNT_THRESHOLD`
+    rows, the estimate is returned as `count` and `count_is_approximate` is
+    true; smaller result sets are counted exactly. The estimate is only
+    reported: pages are bounded by the rows actually read, so pages past the
+    real end are empty rather than 404, and a low estimate hides no rows.
+    """
+
+    def django_paginator_class(self, *args, **kwargs) -> ApproximateCountPaginator:
+        return ApproximateCountPaginator(
+            *args, threshold=settings.APPROXIMATE_COUNT_THRESHOLD, **kwargs
+        )
+
+    def get_paginated_response(self, data):
+        """
+        Add the `count_is_approximate` flag after the count.
+        """
+        return Response(
+            {
+                "count": self.page.paginator.count,
+                "count_is_approximate": self.page.paginator.count_is_approximate,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        """
+        Document the `count_is_approximate` flag.
+        """
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_is_approximate"] = {
+            "type": "boolean",
+            "example": False,
+        }
+        return response_schema
+
+
+class KeysetPagination(ApproximateCountPagination):
+    """
+    Page number pagination that switches to keyset (cursor) pagination when
+    the `cursor` query parameter is present, e.g. `?cursor=` for the first page.
+
+    Keyset pages are ordered by `key_field` with rows lacking a key last,
+    ordered by primary key, and are fetched with index range conditions only:
+    no COUNT query and no OFFSET, so deep pages cost the same as the first.
+    """
+
+    cursor_query_param = "cursor"
+    cursor_query_description = "The pagination cursor value."
+    key_field = "external_id"
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Paginate by cursor when requested, by page number otherwise.
+        """
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        position, reverse = self.decode_cursor(
+            request.query_params[self.cursor_query_param], queryset.model
+        )
+        rows = self._slice(queryset, position, reverse, page_size + 1)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.first_position = self._position(rows[0]) if rows else position
+        self.last_position = self._position(rows[-1]) if rows else position
+        return rows
+
+    def _slice(
+        self,
+        queryset: QuerySet,
+        position: Optional[Tuple[Any, Any]],
+        reverse: bool,
+        limit: int,
+    ) -> List[Any]:
+        """
+        Return up to `limit` rows after (or before, if `reverse`) a position.
+
+        Keyed rows and unkeyed rows are read with separate range queries; the
+        second one only runs when a page crosses from one group to the other.
+        """
+        key = self.key_field
+        keyed = queryset.filter(**{f"{key}__isnull": False})
+        unkeyed = queryset.filter(**{f"{key}__isnull": True})
+        key_value, pk = position if position else (None, None)
+
+        if not reverse:
+            if position is None or key_value is not None:
+                if key_value is not None:
+                    keyed = keyed.filter(**{f"{key}__gt": key_value})
+                rows = list(keyed.order_by(key)[:limit])
+                if len(rows) == limit:
+                    return rows
+                return rows + list(unkeyed.order_by("pk")[: limit - len(rows)])
+            return list(unkeyed.filter(pk__gt=pk).order_by("pk")[:limit])
+
+        if key_value is not None:
+            keyed = keyed.filter(**{f"{key}__lt": key_value})
+            return list(keyed.order_by(f"-{key}")[:limit])
+        rows = list(unkeyed.filter(pk__lt=pk).order_by("-pk")[:limit])
+        if len(rows) == limit:
+            return rows
+        return rows + list(keyed.order_by(f"-{key}")[: limit - len(rows)])
+
+    def _position(self, row: Any) -> Tuple[Any, Any]:
+        """
+        Return the `(key, pk)` position of a model instance or values() dict.
+        """
+        if isinstance(row, dict):
+            return row.get(self.key_field), row.get("id")
+        return getattr(row, self.key_field), row.pk
+
+    def encode_cursor(self, position: Tuple[Any, Any], reverse: bool) -> str:
+        """
+        Encode a position and direction as an opaque cursor string.
+        """
+        payload = json.dumps([*position, reverse], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    def decode_cursor(
+        self, cursor: str, model: Type[Model]
+    ) -> Tuple[Optional[Tuple[Any, Any]], bool]:
+        """
+        Decode a cursor into its position and direction; empty means first page.
+
+        The key value is validated by the `key_field` of `model` and the
+        primary key must be an integer, so a forged cursor is a 404 rather
+        than a database error.
+        """
+        if not cursor:
+            return None, False
+        try:
+            key_value, pk, reverse = json.loads(base64.urlsafe_b64decode(cursor))
+            if key_value is not None:
+                key_value = model._meta.get_field(self.key_field).to_python(key_value)
+        except (binascii.Error, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if type(pk) is not int or not isinstance(reverse, bool):
+            raise NotFound(self.invalid_cursor_message)
+        return (key_value, pk), reverse
+
+    def _cursor_link(self, position: Tuple[Any, Any], reverse: bool) -> str:
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(position, reverse)
+        )
+
+    def get_paginated_response(self, data):
+        """
+        Return keyset pages without a count, page number pages as usual.
+        """
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(
+            {
+                "next": (
+                    self._cursor_link(self.last_position, False)
+                    if self.has_next
+                    else None
+                ),
+                "previous": (
+                    self._cursor_link(self.first_position, True)
+                    if self.has_previous
+                    else None
+                ),
+                "results": data,
+            }
+        )
+
+    def get_schema_operation_parameters(self, view):
+        """
+        Document the cursor parameter next to the page number parameters.
+        """
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.cursor_query_description,
+                "schema": {"type": "string"},
+            }
+        ]
@@ -0,0 +1,32 @@
+import threading
+import time
+
+
+class QueryCounter:
+    """
+    Execute wrapper counting queries and the time spent running them.
+
+    Install it with `connection.execute_wrapper`. Updates are locked, so one
+    counter can be installed on the connections of several threads.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.count += 1
+                self.seconds += elapsed
+                self.observe(sql)
+
+    def observe(self, sql: str) -> None:
+        """
+        Hook called with the statement of every query, under the lock.
+        """
@@ -0,0 +1,127 @@
+import csv
+import datetime
+import io
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer producing the same compact output with orjson.
+
+    Datetimes are rendered like DRF's DateTimeField (ISO 8601 with `Z` for
+    UTC), other non-native types go through DRF's JSON encoder. Indented
+    output and non-default JSON settings fall back to the standard renderer.
+    """
+
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render `data` into JSON, returning a bytestring.
+        """
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=encoders.JSONEncoder().default, option=self.options
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping of U+2028 and U+2029 as JSONRenderer.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Renderer writing one JSON document per line (newline-delimited JSON).
+
+    `render_chunks` encodes chunks of rows lazily for streaming responses.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render a list of rows, or a single document, into NDJSON.
+        """
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        return b"".join(self.render_chunks([rows], list(rows[0]) if rows else []))
+
+    def render_chunks(
+        self, chunks: Iterable[List[Dict[str, Any]]], fields: Sequence[str]
+    ) -> Iterator[bytes]:
+        """
+        Yield the encoded lines of every chunk of rows.
+        """
+        options = ORJSONRenderer.options | orjson.OPT_APPEND_NEWLINE
+        for rows in chunks:
+            yield b"".join(orjson.dumps(row, option=options) for row in rows)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Renderer writing rows as CSV with a header line.
+
+    Datetimes use the same ISO 8601 format as the JSON renderers and null
+    values are written as empty cells.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render a list of rows, or a single document, into CSV.
+        """
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        return b"".join(self.render_chunks([rows], list(rows[0]) if rows else []))
+
+    def render_chunks(
+        self, chunks: Iterable[List[Dict[str, Any]]], fields: Sequence[str]
+    ) -> Iterator[bytes]:
+        """
+        Yield the header line, then the encoded lines of every chunk of rows.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for rows in chunks:
+            writer.writerows(
+                [_csv_value(row[field]) for field in fields] for row in rows
+            )
+            yield buffer.getvalue().encode(self.charset)
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode(self.charset)
+
+
+def _csv_value(value: Any) -> Any:
+    """
+    Format a value for a CSV cell.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+    return value
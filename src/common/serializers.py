@@ -0,0 +1,160 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from common.models import SyncRun
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField resolving its values from the objects preloaded by
+    a BulkListSerializer, instead of running one query per item.
+    """
+
+    preloaded: Optional[Dict[Any, models.Model]] = None
+
+    def to_python_pk(self, data: Any) -> Any:
+        """
+        Return `data` as a primary key of the related model.
+        """
+        if isinstance(data, bool):
+            raise TypeError
+        return self.get_queryset().model._meta.pk.to_python(data)
+
+    def to_internal_value(self, data):
+        if self.preloaded is None or self.pk_field is not None:
+            return super().to_internal_value(data)
+        try:
+            pk = self.to_python_pk(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if pk not in self.preloaded:
+            self.fail("does_not_exist", pk_value=data)
+        return self.preloaded[pk]
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer writing all items with `bulk_create`/`bulk_update`.
+
+    Related objects of BulkPrimaryKeyRelatedField fields are loaded with one
+    query per field for the whole list. For updates, `instance` is a
+    queryset and every item must carry the `id` of one of its objects; the
+    matching objects are loaded with a single query as well.
+    """
+
+    default_error_messages = {"not_found": "Object not found."}
+
+    def to_internal_value(self, data):
+        items = data if isinstance(data, list) else []
+        items = [item for item in items if isinstance(item, dict)]
+        related_fields = [
+            field
+            for field in self.child.fields.values()
+            if isinstance(field, BulkPrimaryKeyRelatedField) and not field.read_only
+        ]
+        for field in related_fields:
+            field.preloaded = _in_bulk(
+                field.get_queryset(),
+                (item.get(field.field_name) for item in items),
+                field.to_python_pk,
+            )
+        if self.instance is not None:
+            self._instances = _in_bulk(
+                self.instance,
+                (item.get("id") for item in items),
+                self.instance.model._meta.pk.to_python,
+            )
+            self._validated_instances: List[models.Model] = []
+        try:
+            return super().to_internal_value(data)
+        finally:
+            for field in related_fields:
+                field.preloaded = None
+
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+
+        to_python = self.instance.model._meta.pk.to_python
+        try:
+            instance = self._instances[to_python(data["id"])]
+        except (KeyError, TypeError, ValueError, DjangoValidationError):
+            raise ValidationError({"id": [self.error_messages["not_found"]]})
+        self.child.instance = instance
+        try:
+            validated = super().run_child_validation(data)
+        finally:
+            self.child.instance = None
+        self._validated_instances.append(instance)
+        return validated
+
+    def create(self, validated_data: List[Dict[str, Any]]) -> List[models.Model]:
+        model = self.child.Meta.model
+        objects = [model(**attrs) for attrs in validated_data]
+        for obj in objects:
+            obj.refresh_content_hash()
+        return model.objects.bulk_create(objects)
+
+    def update(self, instance, validated_data: List[Dict[str, Any]]):
+        model = self.child.Meta.model
+        now = timezone.now()
+        fields = {"content_hash", "updated_at"}
+        for obj, attrs in zip(self._validated_instances, validated_data):
+            for name, value in attrs.items():
+                setattr(obj, name, value)
+            obj.refresh_content_hash()
+            obj.updated_at = now
+            fields.update(attrs)
+        model.objects.bulk_update(self._validated_instances, sorted(fields))
+        return self._validated_instances
+
+
+class SyncRunSerializer(serializers.ModelSerializer):
+    """
+    Read-only serializer for the SyncRun model.
+    """
+
+    class Meta:
+        model = SyncRun
+        fields = (
+            "id",
+            "resource",
+            "method",
+            "write_strategy",
+            "started_at",
+            "finished_at",
+            "duration_seconds",
+            "fetch_seconds",
+            "diff_seconds",
+            "write_seconds",
+            "fetched_count",
+            "inserted_count",
+            "updated_count",
+            "downloaded_bytes",
+            "query_count",
+            "outcome",
+            "error",
+        )
+        read_only_fields = fields
+
+
+def _in_bulk(
+    queryset: models.QuerySet, values: Iterable[Any], to_python: Callable[[Any], Any]
+) -> Dict[Any, models.Model]:
+    """
+    Return the objects of `queryset` whose pk is among `values`, by pk.
+    Values that are not valid primary keys are skipped.
+    """
+    pks = set()
+    for value in values:
+        try:
+            pks.add(to_python(value))
+        except (TypeError, ValueError, DjangoValidationError):
+            continue
+    pks.discard(None)
+    return queryset.in_bulk(pks) if pks else {}
@@ -1,34 +1,103 @@
+import hashlib
 import logging
-from typing import Any, Dict, List, Optional
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
+import ijson
 import requests
 from requests.adapters import HTTPAdapter, Retry
 
+from common.models import ApiValidators
+
 logger = logging.getLogger(__name__)
 
 CLIENT_PROTOCOL = "https"
 CLIENT_DOMAIN = "jsonplaceholder.typicode.com"
 
+# Validators of the responses fetched but not synchronized yet, by URL.
+Validators = Dict[str, Dict[str, Optional[str]]]
+
+
+def store_validators(validators: Validators) -> None:
+    """
+    Save the validators of synchronized responses, replacing older ones.
+    """
+    ApiValidators.objects.bulk_create(
+        [ApiValidators(url=url, **values) for url, values in validators.items()],
+        update_conflicts=True,
+        unique_fields=["url"],
+        update_fields=["etag", "last_modified", "digest", "updated_at"],
+    )
+
 
 class FakeApiRequestsHandler:
     """
     Base class to handle REST API requests to a generic endpoint.
 
     Child classes should implement `list_items`.
+
+    When `page_size` is set, lists are fetched page by page with the
+    `_page`/`_limit` query params, and pages after the first one are
+    fetched concurrently by up to `max_workers` threads.
+
+    When `stream` is set, the response body is parsed incrementally and
+    items are yielded lazily instead of being loaded as one list. Streaming
+    and paged fetching are exclusive.
+
+    When `conditional` is set (it is off by default), the
+    `ETag`/`Last-Modified` validators and the body digest of each endpoint
+    are kept in ApiValidators rows and sent back as
+    `If-None-Match`/`If-Modified-Since`. A `304` response or an unchanged
+    body yields no items and sets `not_modified`. New validators are only
+    persisted by `save_validators`, once the caller has stored the data.
+    Streamed responses yield their items before the digest is known, so they
+    are only skipped on a `304`. Paged fetching does not use conditional
+    requests; `_probe_endpoint` sends one for the whole list beforehand.
+
+    `downloaded_bytes` counts the response bodies received by the handler.
     """
 
     API_ENDPOINT: str = f"{CLIENT_PROTOCOL}://{CLIENT_DOMAIN}"
+    page_size: Optional[int] = None
+    max_workers: int = 4
+    pool_size: int = 10
+    stream: bool = False
+    stream_chunk_size: int = 64 * 1024
+    conditional: bool = False
 
-    def __init__(self, endpoint: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        endpoint: Optional[str] = None,
+        page_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        pool_size: Optional[int] = None,
+        stream: Optional[bool] = None,
+        conditional: Optional[bool] = None,
+    ) -> None:
         """
         Initialize the API request handler with a session that has retries.
         """
         self.api_endpoint: str = endpoint or self.API_ENDPOINT
+        self.page_size = page_size or self.page_size
+        self.max_workers = max_workers or self.max_workers
+        self.pool_size = max(pool_size or self.pool_size, self.max_workers)
+        self.stream = self.stream if stream is None else stream
+        self.conditional = self.conditional if conditional is None else conditional
+        if self.stream and self.page_size:
+            raise ValueError("stream and page_size cannot be combined")
+        self.not_modified: bool = False
+        self.downloaded_bytes: int = 0
+        self._bytes_lock = threading.Lock()
+        self.pending_validators: Validators = {}
         self.session: requests.Session = self._create_session()
 
     def _create_session(self) -> requests.Session:
         """
-        Create a requests session with a retry strategy.
+        Create a requests session with a retry strategy and a connection
+        pool large enough for the concurrent page fetches.
         """
         session = requests.Session()
         retries = Retry(
@@ -37,7 +106,11 @@ class FakeApiRequestsHandler:
             status_forcelist=(500, 502, 503, 504),
             allowed_methods=frozenset(["GET"]),
         )
-        adapter = HTTPAdapter(max_retries=retries)
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retries,
+        )
         session.mount("http://", adapter)
         session.mount("https://", adapter)
         return session
@@ -49,26 +122,241 @@ class FakeApiRequestsHandler:
         try:
             response = self.session.get(url, **kwargs)
             response.raise_for_status()
+            if not kwargs.get("stream"):
+                self._count_bytes(len(response.content))
             return response
         except requests.RequestException as error:
             logger.error(f"API request to {url} failed: {error}")
             return None
 
-    def _list_from_endpoint(self, path: str) -> List[Dict[str, Any]]:
+    def _count_bytes(self, size: int) -> None:
+        """
+        Add `size` bytes to `downloaded_bytes`; pages may be fetched
+        concurrently.
+        """
+        with self._bytes_lock:
+            self.downloaded_bytes += size
+
+    def _list_from_endpoint(self, path: str) -> Iterable[Dict[str, Any]]:
         """
         Helper to fetch a list of items from a specific API path.
 
         Logs a warning if no data is retrieved.
         """
         url = f"{self.api_endpoint}/{path}"
-        response = self._fetch_request_data(url)
+        if self.page_size:
+            return self._list_pages(url)
+        if self.stream:
+            # Validators are read here, as streams may be consumed by another
+            # thread.
+            return self._stream_from_endpoint(url, self._conditional_headers(url))
+
+        response = self._fetch_request_data(url, headers=self._conditional_headers(url))
+        if not response:
+            logger.warning("No data retrieved from %s", url)
+            return []
+        if self._is_not_modified(url, response):
+            return []
+        if self.conditional:
+            digest = hashlib.sha256(response.content).hexdigest()
+            if digest == self._stored_validators(url).get("digest"):
+                logger.info("Content of %s did not change", url)
+                self.not_modified = True
+                return []
+            self._set_pending_validators(url, response, digest)
+        return response.json()
+
+    def _stored_validators(self, url: str) -> Dict[str, Optional[str]]:
+        """
+        Return the validators saved by the last successful run for a URL.
+        """
+        return (
+            ApiValidators.objects.filter(url=url)
+            .values("etag", "last_modified", "digest")
+            .first()
+        ) or {}
+
+    def _conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        Build the If-None-Match/If-Modified-Since headers for a URL.
+        """
+        if not self.conditional:
+            return {}
+        validators = self._stored_validators(url)
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def _is_not_modified(self, url: str, response: requests.Response) -> bool:
+        """
+        Flag the handler as not modified when the server answered 304.
+        """
+        if response.status_code != 304:
+            return False
+        logger.info("Content of %s not modified", url)
+        self.not_modified = True
+        return True
+
+    def _set_pending_validators(
+        self, url: str, response: requests.Response, digest: Optional[str]
+    ) -> None:
+        """
+        Remember the validators of a response until `save_validators` is called.
+        """
+        self.pending_validators[url] = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "digest": digest,
+        }
+
+    def save_validators(self) -> None:
+        """
+        Persist the validators of the responses fetched by this handler.
+        """
+        store_validators(self.pending_validators)
+        self.pending_validators = {}
+
+    def _probe_endpoint(self, path: str) -> bool:
+        """
+        Send a conditional request for the whole list of an API path and
+        return whether it changed, reading the headers only.
+
+        The validators of a changed list are kept pending, without a body
+        digest, until the caller has stored its items page by page.
+        """
+        url = f"{self.api_endpoint}/{path}"
+        response = self._fetch_request_data(
+            url, stream=True, headers=self._conditional_headers(url)
+        )
+        if not response:
+            return True
+        with response:
+            if self._is_not_modified(url, response):
+                return False
+            self._set_pending_validators(url, response, None)
+        return True
+
+    def _stream_from_endpoint(
+        self, url: str, headers: Dict[str, str]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield the items of a JSON array response while it downloads.
+        """
+        response = self._fetch_request_data(url, stream=True, headers=headers)
         if not response:
             logger.warning("No data retrieved from %s", url)
+            return
+        if self._is_not_modified(url, response):
+            return
+
+        with response:
+            digest = hashlib.sha256()
+            items = ijson.sendable_list()
+            parser = ijson.items_coro(items, "item", use_float=True)
+            for chunk in response.iter_content(chunk_size=self.stream_chunk_size):
+                self._count_bytes(len(chunk))
+                digest.update(chunk)
+                parser.send(chunk)
+                yield from items
+                del items[:]
+            parser.close()
+            yield from items
+
+        if self.conditional:
+            self._set_pending_validators(url, response, digest.hexdigest())
+
+    def _fetch_page(self, url: str, page: int) -> Optional[requests.Response]:
+        """
+        Fetch a single 1-based page of `page_size` items.
+        """
+        return self._fetch_request_data(
+            url, params={"_page": page, "_limit": self.page_size}
+        )
+
+    def _page_from_endpoint(self, path: str, page: int) -> List[Dict[str, Any]]:
+        """
+        Helper to fetch a single page of `page_size` items from an API path.
+        """
+        url = f"{self.api_endpoint}/{path}"
+        response = self._fetch_page(url, page)
+        if not response:
+            logger.warning("Page %s of %s could not be retrieved", page, url)
             return []
         return response.json()
 
-    def list_items(self) -> List[Dict[str, Any]]:
+    def _count_from_endpoint(self, path: str) -> Optional[int]:
+        """
+        Helper to read the total item count of an API path from the
+        `X-Total-Count` header. Returns None when it is not available.
+        """
+        url = f"{self.api_endpoint}/{path}"
+        response = self._fetch_request_data(url, params={"_page": 1, "_limit": 1})
+        total_count = response.headers.get("X-Total-Count") if response else None
+        return int(total_count) if total_count is not None else None
+
+    def _list_pages(self, url: str) -> List[Dict[str, Any]]:
+        """
+        Fetch every page of a paginated list.
+
+        The total is read from the `X-Total-Count` header of the first page so
+        the remaining pages can be fetched concurrently. Without that header
+        pages are fetched one after another until a short page is returned.
+        """
+        response = self._fetch_page(url, 1)
+        if not response:
+            logger.warning("No data retrieved from %s", url)
+            return []
+        items = response.json()
+
+        total_count = response.headers.get("X-Total-Count")
+        if total_count is None:
+            page = 1
+            page_items = items
+            while len(page_items) == self.page_size:
+                page += 1
+                response = self._fetch_page(url, page)
+                if not response:
+                    logger.warning("Page %s of %s could not be retrieved", page, url)
+                    break
+                page_items = response.json()
+                items.extend(page_items)
+            return items
+
+        page_count = math.ceil(int(total_count) / self.page_size)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            responses = executor.map(
+                partial(self._fetch_page, url), range(2, page_count + 1)
+            )
+            for page, response in enumerate(responses, start=2):
+                if not response:
+                    logger.warning("Page %s of %s could not be retrieved", page, url)
+                    continue
+                items.extend(response.json())
+        return items
+
+    def list_items(self) -> Iterable[Dict[str, Any]]:
         """
         Child classes must implement this to fetch list of items.
         """
         raise NotImplementedError("list_items must be implemented in child classes.")
+
+    def list_page(self, page: int) -> List[Dict[str, Any]]:
+        """
+        Child classes must implement this to fetch one page of items.
+        """
+        raise NotImplementedError("list_page must be implemented in child classes.")
+
+    def count_items(self) -> Optional[int]:
+        """
+        Child classes must implement this to count the available items.
+        """
+        raise NotImplementedError("count_items must be implemented in child classes.")
+
+    def probe_items(self) -> bool:
+        """
+        Child classes must implement this to check whether the items changed.
+        """
+        raise NotImplementedError("probe_items must be implemented in child classes.")
@@ -1,20 +1,129 @@
+import io
 import logging
-from typing import Any, Dict, List, Type
+import queue
+import threading
+import time
+from collections.abc import Sequence
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type
 
-from django.db import models, transaction
+from django.conf import settings
+from django.db import DatabaseError, connection, models, transaction
+from django.utils import timezone
+
+from common.cache import bump_cache_version
+from common.models import SyncRun
+from common.queries import QueryCounter
 
 logger = logging.getLogger(__name__)
 
+WRITE_STRATEGY_DIFF = "diff"
+WRITE_STRATEGY_UPSERT = "upsert"
+
+SYNC_PHASES = ("fetch", "diff", "write")
+
+
+def _copy_value(value: Any) -> str:
+    """
+    Format a database value for PostgreSQL's COPY text format.
+    """
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class _CopyStream(io.TextIOBase):
+    """
+    Read-only file object over an iterator of COPY lines, used by copy_expert.
+    """
+
+    def __init__(self, lines: Iterator[str]) -> None:
+        self._lines = lines
+        self._buffer = ""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> str:
+        chunks = [self._buffer]
+        length = len(self._buffer)
+        while size is None or size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            chunks.append(line)
+            length += len(line)
+        data = "".join(chunks)
+        if size is None or size < 0:
+            size = len(data)
+        self._buffer = data[size:]
+        return data[:size]
+
 
 class BaseSyncService:
     """
     Base class for synchronizing external API data into a Django model.
     Subclasses must define model, handler, and implement map_fields.
+
+    When `batch_size` is set, API items are diffed and written in batches of
+    that size, each one in its own transaction, so memory and lock time are
+    bounded by the batch and not by the table size.
+
+    The `diff` write strategy reads the stored hashes and issues
+    `bulk_create`/`bulk_update`; the `upsert` strategy writes every batch
+    with a single PostgreSQL `INSERT ... ON CONFLICT DO UPDATE` statement.
+
+    Handlers may return a lazy iterable of items (e.g. a streamed response);
+    its batches are then read by a background thread up to
+    `prefetch_batches` ahead, so fetching overlaps with database writes.
+    Lazy iterables are batched by `stream_batch_size` when no batch size is
+    set, so memory stays bounded by the batch.
+
+    Every run is recorded as a SyncRun with its outcome, counts, query count
+    and the time spent in each phase: waiting for API items (`fetch`),
+    mapping and comparing them with the stored rows (`diff`), and writing
+    them (`write`; COPY loads map items while writing).
     """
 
     model: Type[models.Model] = None
     handler_class = None
     unique_field: str = "external_id"
+    prefetch_batches: int = 2
+    stream_batch_size: int = 1000
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        write_strategy: Optional[str] = None,
+        handler_options: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Initialize the service, falling back to settings.SYNC_BATCH_SIZE
+        and settings.SYNC_WRITE_STRATEGY.
+
+        `handler_options` are passed to the handler class, e.g. `page_size`
+        and `max_workers` for paged, concurrent fetching.
+        """
+        self.handler_options: Dict[str, Any] = handler_options or {}
+        self.fetched_count: int = 0
+        self.phase_seconds: Dict[str, float] = dict.fromkeys(SYNC_PHASES, 0.0)
+        self.handler = None
+        self.batch_size: Optional[int] = batch_size or getattr(
+            settings, "SYNC_BATCH_SIZE", None
+        )
+        self.write_strategy: str = write_strategy or getattr(
+            settings, "SYNC_WRITE_STRATEGY", WRITE_STRATEGY_DIFF
+        )
+        if self.write_strategy not in (WRITE_STRATEGY_DIFF, WRITE_STRATEGY_UPSERT):
+            raise ValueError(f"Unknown write strategy: {self.write_strategy}")
 
     def map_fields(self, item: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -23,42 +132,474 @@ class BaseSyncService:
         """
         raise NotImplementedError
 
-    def synchronize(self) -> None:
+    def preload(self, api_data: List[Dict[str, Any]]) -> None:
+        """
+        Resolve related data for a list of API items before they are mapped.
+        Subclasses can override this to avoid per-item queries in map_fields.
+        """
+
+    def synchronize(self) -> tuple[int, int]:
         """
         Run the synchronization: fetch API data and bulk sync into DB.
+
+        Returns the inserted and updated counts. Nothing is written when
+        the handler reports that the upstream data did not change.
+        """
+        with self.record_run("synchronize") as run:
+            self.handler, data = self.fetch()
+            run["counts"] = self.write(self.handler, data)
+        return run["counts"]
+
+    def fetch(self) -> tuple[Any, Iterable[Dict[str, Any]]]:
+        """
+        Fetch the API items, returning the handler used and the items.
         """
-        handler = self.handler_class()
+        self.phase_seconds = dict.fromkeys(SYNC_PHASES, 0.0)
+        handler = self.handler_class(**self.handler_options)
+        return handler, self._fetch_items(handler)
 
+    def synchronize_page(self, page: int) -> tuple[int, int]:
+        """
+        Fetch a single page of `page_size` API items and bulk sync it into DB.
+        Used to split a synchronization into independent chunks.
+        """
+        with self.record_run("page") as run:
+            self.handler = self.handler_class(**self.handler_options)
+            with self._phase("fetch"):
+                data = self.handler.list_page(page)
+            run["counts"] = self._bulk_sync(data)
+        return run["counts"]
+
+    def write(self, handler, data: Iterable[Dict[str, Any]]) -> tuple[int, int]:
+        """
+        Bulk sync fetched items into the DB and save the handler validators.
+        """
+        inserted_count, updated_count = self._bulk_sync(data)
+
+        if handler.not_modified:
+            logger.info(f"'{self.model.__name__}(s)' not modified, sync skipped.")
+            return 0, 0
+        handler.save_validators()
+
+        logger.info(f"{self.fetched_count} '{self.model.__name__}(s)' fetched.")
+        logger.info(f"{inserted_count} '{self.model.__name__}(s)' inserted.")
+        logger.info(f"{updated_count} '{self.model.__name__}(s)' updated.")
+        return inserted_count, updated_count
+
+    def bulk_load(self) -> tuple[int, int]:
+        """
+        Load all API items for initial or full reloads using COPY.
+
+        Mapped rows are streamed batch by batch with `COPY FROM STDIN` into a
+        temporary staging table and merged into the model table with a single
+        upsert. Conditional requests are disabled so everything is reloaded.
+        """
+        with self.record_run("bulk_load") as run:
+            run["counts"] = self._copy_load()
+        return run["counts"]
+
+    def _copy_load(self) -> tuple[int, int]:
+        """
+        Run `bulk_load`.
+        """
+        self.handler = self.handler_class(
+            **{**self.handler_options, "conditional": False}
+        )
+        data = self._fetch_items(self.handler)
+        fields = self._insert_fields()
+        quote = connection.ops.quote_name
+        opts = self.model._meta
+        staging_table = quote(f"{opts.db_table}_staging")
+        columns = ", ".join(quote(f.column) for f in fields)
+        unique_column = quote(opts.get_field(self.unique_field).column)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {staging_table} ON COMMIT DROP AS "
+                f"SELECT {columns} FROM {quote(opts.db_table)} WITH NO DATA"
+            )
+            for batch in self._batches(data):
+                with self._phase("write"):
+                    # Related lookups must run before COPY takes over the
+                    # connection.
+                    self.preload(batch)
+                    cursor.copy_expert(
+                        f"COPY {staging_table} ({columns}) FROM STDIN",
+                        _CopyStream(self._copy_lines(batch, fields)),
+                    )
+            with self._phase("write"):
+                cursor.execute(
+                    self._upsert_sql(
+                        fields,
+                        f"SELECT DISTINCT ON ({unique_column}) {columns} "
+                        f"FROM {staging_table} ORDER BY {unique_column}",
+                    )
+                )
+                inserted_count, updated_count = cursor.fetchone()
+                cursor.execute(f"DROP TABLE {staging_table}")
+        if inserted_count or updated_count:
+            bump_cache_version(self.model)
+
+        logger.info(f"{self.fetched_count} '{self.model.__name__}(s)' fetched.")
+        logger.info(f"{inserted_count} '{self.model.__name__}(s)' inserted.")
+        logger.info(f"{updated_count} '{self.model.__name__}(s)' updated.")
+        return inserted_count, updated_count
+
+    @contextmanager
+    def _phase(self, name: str) -> Iterator[None]:
+        """
+        Add the duration of a block to phase `name` of the current run.
+        """
+        started = time.perf_counter()
         try:
-            data = handler.list_items()
-            logger.info(f"{len(data)} '{self.model.__name__}(s)' fetched from API.")
+            yield
+        finally:
+            self.phase_seconds[name] += time.perf_counter() - started
+
+    @contextmanager
+    def record_run(self, method: str, handler=None) -> Iterator[Dict[str, Any]]:
+        """
+        Measure the block as a run of `method` and save it as a SyncRun.
+
+        The block stores the inserted and updated counts in `counts` of the
+        yielded dict. Failed runs are recorded before the error propagates.
+        Pass the `handler` of items fetched beforehand with `fetch` to
+        include their fetch time in the run.
+        """
+        fetch_seconds = 0.0
+        if handler is None:
+            self.phase_seconds = dict.fromkeys(SYNC_PHASES, 0.0)
+            self.fetched_count = 0
+            self.handler = None
+        else:
+            self.handler = handler
+            fetch_seconds = self.phase_seconds["fetch"]
+        run: Dict[str, Any] = {"counts": (0, 0)}
+        queries = QueryCounter()
+        outcome, error_message = SyncRun.Outcome.SUCCESS, ""
+        started_at = timezone.now() - timedelta(seconds=fetch_seconds)
+        started = time.perf_counter() - fetch_seconds
+        try:
+            with connection.execute_wrapper(queries):
+                yield run
+        except Exception as error:
+            outcome, error_message = SyncRun.Outcome.FAILED, repr(error)
+            raise
+        finally:
+            if outcome == SyncRun.Outcome.SUCCESS and getattr(
+                self.handler, "not_modified", False
+            ):
+                outcome = SyncRun.Outcome.NOT_MODIFIED
+            self._save_run(
+                method=method,
+                started_at=started_at,
+                duration_seconds=time.perf_counter() - started,
+                queries=queries.count,
+                counts=run["counts"],
+                outcome=outcome,
+                error=error_message,
+            )
+
+    def _save_run(
+        self,
+        method: str,
+        started_at,
+        duration_seconds: float,
+        queries: int,
+        counts: tuple[int, int],
+        outcome: str,
+        error: str,
+    ) -> None:
+        """
+        Save a SyncRun and delete the runs older than
+        settings.SYNC_RUN_RETENTION_DAYS. Failing to record a run does not
+        fail the run itself.
+        """
+        try:
+            retention = timedelta(days=settings.SYNC_RUN_RETENTION_DAYS)
+            SyncRun.objects.filter(started_at__lt=timezone.now() - retention).delete()
+            SyncRun.objects.create(
+                resource=self.model._meta.label_lower,
+                method=method,
+                write_strategy=self.write_strategy,
+                started_at=started_at,
+                finished_at=timezone.now(),
+                duration_seconds=duration_seconds,
+                **{
+                    f"{phase}_seconds": seconds
+                    for phase, seconds in self.phase_seconds.items()
+                },
+                fetched_count=self.fetched_count,
+                inserted_count=counts[0],
+                updated_count=counts[1],
+                downloaded_bytes=getattr(self.handler, "downloaded_bytes", 0),
+                query_count=queries,
+                outcome=outcome,
+                error=error,
+            )
+        except DatabaseError:
+            logger.exception(f"Failed to record the {self.model.__name__} sync run.")
+
+    def _fetch_items(self, handler) -> Iterable[Dict[str, Any]]:
+        """
+        Fetch the API items through the handler, logging failures.
+        """
+        try:
+            with self._phase("fetch"):
+                data = handler.list_items()
         except Exception as error:
             logger.error(f"Failed to fetch {self.model.__name__}s from API: {error}")
             raise
+        return data
 
-        inserted_count, updated_count = self._bulk_sync(data)
+    def _copy_lines(
+        self, api_data: List[Dict[str, Any]], fields: List[models.Field]
+    ) -> Iterator[str]:
+        """
+        Yield one COPY text line per item of an already preloaded batch.
+        """
+        for item in api_data:
+            if item.get("id") is None:
+                continue
+            obj = self._build_object(item["id"], item)
+            yield "\t".join(
+                _copy_value(
+                    field.get_db_prep_save(field.pre_save(obj, add=True), connection)
+                )
+                for field in fields
+            ) + "\n"
 
-        logger.info(f"{inserted_count} '{self.model.__name__}(s)' inserted.")
-        logger.info(f"{updated_count} '{self.model.__name__}(s)' updated.")
+    def _iter_batches(
+        self, api_data: Iterable[Dict[str, Any]], batch_size: Optional[int] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Split API items into lists of `batch_size` items (the service's by
+        default). Without a batch size all items are returned as one batch.
+        """
+        self.fetched_count = 0
+        iterator = iter(api_data)
+        batch_size = batch_size or self.batch_size
+        while batch := list(islice(iterator, batch_size)):
+            self.fetched_count += len(batch)
+            yield batch
+
+    def _prefetch_batches(
+        self, api_data: Iterable[Dict[str, Any]]
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Read batches of a lazy iterable in a background thread.
+
+        At most `prefetch_batches` batches are buffered; errors raised while
+        fetching are re-raised in the consuming thread.
+        """
+        batches: queue.Queue = queue.Queue(maxsize=self.prefetch_batches)
+        stopped = threading.Event()
+        finished = object()
+
+        def put(value: Any) -> None:
+            while not stopped.is_set():
+                try:
+                    batches.put(value, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def produce() -> None:
+            try:
+                batch_size = self.batch_size or self.stream_batch_size
+                for batch in self._iter_batches(api_data, batch_size):
+                    put(batch)
+                    if stopped.is_set():
+                        return
+                put(finished)
+            except Exception as error:
+                put(error)
+
+        threading.Thread(target=produce, daemon=True).start()
+        try:
+            while (batch := batches.get()) is not finished:
+                if isinstance(batch, Exception):
+                    raise batch
+                yield batch
+        finally:
+            stopped.set()
+
+    def _batches(
+        self, api_data: Iterable[Dict[str, Any]]
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Batch in-memory items directly and prefetch lazily fetched ones.
+        """
+        if isinstance(api_data, Sequence):
+            batches = self._iter_batches(api_data)
+        else:
+            batches = self._prefetch_batches(api_data)
+        try:
+            while True:
+                with self._phase("fetch"):
+                    batch = next(batches, None)
+                if batch is None:
+                    return
+                yield batch
+        finally:
+            batches.close()
+
+    def _bulk_sync(self, api_data: Iterable[Dict[str, Any]]) -> tuple[int, int]:
+        """
+        Shared bulk sync implementation.
+        Every batch is written in its own transaction.
+        """
+        write_batch = (
+            self._upsert_batch
+            if self.write_strategy == WRITE_STRATEGY_UPSERT
+            else self._diff_batch
+        )
+        inserted_count = 0
+        updated_count = 0
+        for batch in self._batches(api_data):
+            started = time.perf_counter()
+            diff_seconds = self.phase_seconds["diff"]
+            with transaction.atomic():
+                inserted, updated = write_batch(batch)
+            # Whatever part of the batch was not spent diffing was writing.
+            self.phase_seconds["write"] += (time.perf_counter() - started) - (
+                self.phase_seconds["diff"] - diff_seconds
+            )
+            inserted_count += inserted
+            updated_count += updated
+        if inserted_count or updated_count:
+            bump_cache_version(self.model)
+        return inserted_count, updated_count
+
+    def _build_object(self, external_id: Any, item: Dict[str, Any]) -> models.Model:
+        """
+        Build an unsaved model instance with its content hash for an API item.
+        """
+        obj = self.model(**{self.unique_field: external_id, **self.map_fields(item)})
+        obj.refresh_content_hash()
+        return obj
 
-    def _bulk_sync(self, api_data: List[Dict[str, Any]]) -> tuple[int, int]:
+    def _diff_batch(self, api_data: List[Dict[str, Any]]) -> tuple[int, int]:
         """
-        Shared bulk sync implementation using dict comparison.
+        Compare a batch with the stored hashes and bulk create/update it.
         """
-        with transaction.atomic():
+        with self._phase("diff"):
             new_objects, objects_to_update, inserted_count, updated_count = (
                 self._prepare_sync_lists(api_data)
             )
-            self._bulk_insert(new_objects)
-            self._bulk_update(objects_to_update)
+        self._bulk_insert(new_objects)
+        self._bulk_update(objects_to_update)
+        return inserted_count, updated_count
+
+    def _upsert_batch(self, api_data: List[Dict[str, Any]]) -> tuple[int, int]:
+        """
+        Write a batch with `INSERT ... ON CONFLICT DO UPDATE` statements of
+        at most `stream_batch_size` rows when no batch size is set, so that
+        statements and their parameters stay bounded.
+        Rows whose content hash did not change are left untouched.
+        """
+        with self._phase("diff"):
+            self.preload(api_data)
+            objects = {
+                item["id"]: self._build_object(item["id"], item)
+                for item in api_data
+                if item.get("id") is not None
+            }
+            if not objects:
+                return 0, 0
+            fields = self._insert_fields()
+            row_sql = f"({', '.join(['%s'] * len(fields))})"
+
+        inserted_count = 0
+        updated_count = 0
+        chunk_size = self.batch_size or self.stream_batch_size
+        with connection.cursor() as cursor:
+            for chunk in self._iter_chunks(list(objects.values()), chunk_size):
+                with self._phase("diff"):
+                    params = [
+                        field.get_db_prep_save(
+                            field.pre_save(obj, add=True), connection
+                        )
+                        for obj in chunk
+                        for field in fields
+                    ]
+                source_sql = f"VALUES {', '.join([row_sql] * len(chunk))}"
+                cursor.execute(self._upsert_sql(fields, source_sql), params)
+                inserted, updated = cursor.fetchone()
+                inserted_count += inserted
+                updated_count += updated
         return inserted_count, updated_count
 
+    @staticmethod
+    def _iter_chunks(
+        objects: List[models.Model], size: int
+    ) -> Iterator[List[models.Model]]:
+        """
+        Split objects into lists of at most `size` objects.
+        """
+        for start in range(0, len(objects), size):
+            yield objects[start : start + size]
+
+    def _insert_fields(self) -> List[models.Field]:
+        """
+        Return the concrete model fields written by an INSERT. Generated
+        columns, such as search vectors, are computed by the database.
+        """
+        return [
+            f
+            for f in self.model._meta.concrete_fields
+            if not f.primary_key and not f.generated
+        ]
+
+    def _upsert_sql(self, fields: List[models.Field], source_sql: str) -> str:
+        """
+        Build an upsert of `source_sql` rows that reports inserted/updated counts.
+
+        `RETURNING (xmax = 0)` is true for freshly inserted rows and false for
+        updated ones; rows skipped by the WHERE clause are not returned.
+        """
+        quote = connection.ops.quote_name
+        opts = self.model._meta
+        columns = ", ".join(quote(f.column) for f in fields)
+        assignments = ", ".join(
+            f"{column} = EXCLUDED.{column}"
+            for column in (
+                quote(opts.get_field(name).column)
+                for name in (*self.model.hash_fields, "content_hash", "updated_at")
+            )
+        )
+        unique_column = quote(opts.get_field(self.unique_field).column)
+        hash_column = quote(opts.get_field("content_hash").column)
+        return (
+            f"WITH upserted AS ("
+            f"INSERT INTO {quote(opts.db_table)} AS target ({columns}) {source_sql} "
+            f"ON CONFLICT ({unique_column}) DO UPDATE SET {assignments} "
+            f"WHERE target.{hash_column} IS DISTINCT FROM EXCLUDED.{hash_column} "
+            f"RETURNING (xmax = 0) AS inserted) "
+            f"SELECT COUNT(*) FILTER (WHERE inserted), "
+            f"COUNT(*) FILTER (WHERE NOT inserted) FROM upserted"
+        )
+
     def _prepare_sync_lists(self, api_data: List[Dict[str, Any]]):
         """
         Compare API data with existing objects and separate into
         new objects vs objects that need update.
+
+        Only `(external_id, pk, content_hash)` tuples of the existing rows
+        referenced by the given items are loaded; a row is rewritten only
+        when the hash of its mapped fields differs from the stored one.
         """
-        existing_objects = self.model.objects.in_bulk(field_name=self.unique_field)
+        self.preload(api_data)
+        existing_hashes = {
+            external_id: (pk, content_hash)
+            for external_id, pk, content_hash in self.model.objects.filter(
+                **{
+                    f"{self.unique_field}__in": [
+                        item["id"] for item in api_data if item.get("id") is not None
+                    ]
+                }
+            ).values_list(self.unique_field, "pk", "content_hash")
+        }
         new_objects = []
         objects_to_update = []
         inserted_count = 0
@@ -69,20 +610,15 @@ class BaseSyncService:
             if external_id is None:
                 continue
 
-            fields = self.map_fields(item)
-
-            if external_id in existing_objects:
-                obj = existing_objects[external_id]
-                obj_dict = obj.as_field_dict(include=fields.keys())
-                if obj_dict != fields:
-                    for k, v in fields.items():
-                        setattr(obj, k, v)
+            obj = self._build_object(external_id, item)
+            if external_id in existing_hashes:
+                pk, content_hash = existing_hashes[external_id]
+                if content_hash != obj.content_hash:
+                    obj.pk = pk
                     objects_to_update.append(obj)
                     updated_count += 1
             else:
-                new_objects.append(
-                    self.model(**{self.unique_field: external_id, **fields})
-                )
+                new_objects.append(obj)
                 inserted_count += 1
 
         return new_objects, objects_to_update, inserted_count, updated_count
@@ -92,12 +628,20 @@ class BaseSyncService:
         Perform bulk create if there are new objects.
         """
         if new_objects:
-            self.model.objects.bulk_create(new_objects, ignore_conflicts=True)
+            self.model.objects.bulk_create(
+                new_objects, batch_size=self.batch_size, ignore_conflicts=True
+            )
 
     def _bulk_update(self, objects_to_update):
         """
-        Perform bulk update if there are updated objects.
+        Perform bulk update of the synced fields if there are updated objects.
+        `bulk_update` skips `auto_now`, so `updated_at` is set explicitly.
         """
         if objects_to_update:
-            fields = list(objects_to_update[0].as_field_dict().keys())
-            self.model.objects.bulk_update(objects_to_update, fields)
+            now = timezone.now()
+            for obj in objects_to_update:
+                obj.updated_at = now
+            fields = [*self.model.hash_fields, "content_hash", "updated_at"]
+            self.model.objects.bulk_update(
+                objects_to_update, fields, batch_size=self.batch_size
+            )
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+class _StubApiRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serve the stub routes with JSONPlaceholder-style `_page`/`_limit` and
+    `_start`/`_end` pagination, and `ETag`/`If-None-Match` validation.
+    """
+
+    server: "_StubHTTPServer"
+
+    def do_GET(self) -> None:
+        """
+        Return the (optionally paginated) list registered for the path.
+        """
+        parsed = urlparse(self.path)
+        all_items = self.server.routes.get(parsed.path.strip("/"))
+        if all_items is None:
+            self.send_error(404)
+            return
+
+        self.server.requests.append(self)
+        started = time.perf_counter()
+        try:
+            self._respond(parsed, all_items)
+        finally:
+            self.server.windows.append((parsed.path, started, time.perf_counter()))
+
+    def _respond(self, parsed, all_items: List[Dict[str, Any]]) -> None:
+        """
+        Send the page of `all_items` selected by the query params.
+        """
+        time.sleep(self.server.delay)
+        params = {key: int(values[0]) for key, values in parse_qs(parsed.query).items()}
+        items = all_items
+        paginated = "_page" in params or "_start" in params
+        if paginated:
+            limit = params.get("_limit", 10)
+            start = params.get("_start", (params.get("_page", 1) - 1) * limit)
+            items = all_items[start : params.get("_end", start + limit)]
+
+        body = json.dumps(items).encode("utf-8")
+        etag = f'W/"{hashlib.sha256(body).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        if paginated:
+            self.send_header("X-Total-Count", str(len(all_items)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """
+        Keep the test and benchmark output quiet.
+        """
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, routes: Dict[str, List[Dict[str, Any]]], delay: float) -> None:
+        super().__init__(("127.0.0.1", 0), _StubApiRequestHandler)
+        self.routes = routes
+        self.delay = delay
+        self.requests: List[BaseHTTPRequestHandler] = []
+        self.windows: List[Tuple[str, float, float]] = []
+
+
+class StubApiServer:
+    """
+    Local HTTP server mimicking the JSONPlaceholder list endpoints.
+
+    Used as a context manager; `url` can be passed as the `endpoint` of a
+    FakeApiRequestsHandler. `delay` adds latency to every request, and
+    the handled requests are recorded in `requests`, with their
+    `(path, started, finished)` times in `windows`.
+    """
+
+    def __init__(
+        self, routes: Dict[str, List[Dict[str, Any]]], delay: float = 0.0
+    ) -> None:
+        self.routes = routes
+        self.delay = delay
+        self._server: Optional[_StubHTTPServer] = None
+
+    @property
+    def requests(self) -> List[BaseHTTPRequestHandler]:
+        """
+        Requests handled so far, with their `path` and `headers`.
+        """
+        return self._server.requests
+
+    @property
+    def windows(self) -> List[Tuple[str, float, float]]:
+        """
+        `(path, started, finished)` performance counter times of the
+        requests handled so far.
+        """
+        return self._server.windows
+
+    @property
+    def url(self) -> str:
+        """
+        Base URL of the running server.
+        """
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StubApiServer":
+        self._server = _StubHTTPServer(self.routes, self.delay)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
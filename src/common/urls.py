@@ -0,0 +1,8 @@
+from rest_framework import routers
+
+from .views import SyncRunViewSet
+
+router = routers.SimpleRouter()
+router.register(r"runs", SyncRunViewSet, basename="syncrun")
+
+urlpatterns = router.urls
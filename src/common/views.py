@@ -0,0 +1,466 @@
+import hashlib
+from datetime import datetime
+from itertools import islice
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import models, transaction
+from django.db.models import Count, Max
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET
+from django_filters.rest_framework import DjangoFilterBackend
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from rest_framework import serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from common.cache import (
+    api_cache_is_shared,
+    bump_cache_version,
+    get_api_cache,
+    get_cache_version,
+    make_response_cache_key,
+)
+from common.metrics import metrics_registry, record_cache_lookup
+from common.middleware import profile_phase
+from common.models import SyncRun
+from common.renderers import CSVRenderer, NDJSONRenderer
+from common.serializers import SyncRunSerializer
+
+
+class ProfiledAuthenticationMixin:
+    """
+    Report the authentication of a DRF view as the `auth` phase of the
+    request profile (see RequestProfilingMiddleware).
+    """
+
+    def perform_authentication(self, request) -> None:
+        with profile_phase(request._request, "auth"):
+            super().perform_authentication(request)
+
+
+class CachedResponseMixin:
+    """
+    Cache the data of list and retrieve responses of a model viewset.
+
+    Responses are keyed by the request URL, its sorted query params and the
+    cache version of every model in `cache_dependencies` (the viewset model
+    by default). Writes through the viewset bump the version of its model.
+
+    Versions are only bumped in the writing process, so responses are only
+    cached when the API cache is shared by every process.
+    """
+
+    cache_dependencies: Tuple[Type[models.Model], ...] = ()
+
+    def get_cache_dependencies(self) -> Tuple[Type[models.Model], ...]:
+        """
+        Return the models whose changes invalidate this viewset's responses.
+        """
+        return (self.queryset.model, *self.cache_dependencies)
+
+    def get_response_cache_key(self, request) -> str:
+        """
+        Return the cache key of the current request.
+        """
+        versions = [get_cache_version(model) for model in self.get_cache_dependencies()]
+        return make_response_cache_key(
+            self.queryset.model._meta.label_lower,
+            self.action,
+            request.get_host(),
+            request.path,
+            sorted(request.query_params.lists()),
+            request.accepted_media_type,
+            versions,
+        )
+
+    def _cached_response(self, handler, request, *args, **kwargs) -> Response:
+        if not api_cache_is_shared():
+            return handler(request, *args, **kwargs)
+        cache = get_api_cache()
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        record_cache_lookup("api_response", data is not None)
+        if data is not None:
+            return Response(data)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout=settings.API_CACHE_TIMEOUT)
+        return response
+
+    def list(self, request, *args, **kwargs) -> Response:
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        return self._cached_response(super().retrieve, request, *args, **kwargs)
+
+    def perform_create(self, serializer) -> None:
+        super().perform_create(serializer)
+        bump_cache_version(self.queryset.model)
+
+    def perform_update(self, serializer) -> None:
+        super().perform_update(serializer)
+        bump_cache_version(self.queryset.model)
+
+    def perform_destroy(self, instance) -> None:
+        super().perform_destroy(instance)
+        bump_cache_version(self.queryset.model)
+
+
+class ConditionalResponseMixin(CachedResponseMixin):
+    """
+    Answer conditional list and retrieve requests of a model viewset with
+    `304 Not Modified` before any serialization.
+
+    List ETags are derived from the response cache key, i.e. the request and
+    the cache versions of its dependencies, so they cost no query: an
+    aggregate over the filtered queryset would scan the rows that keyset
+    pagination and count estimates avoid reading. Detail validators are
+    derived from the latest `updated_at` of the object and of its embedded
+    relations, and cached next to the response until a dependency changes.
+    """
+
+    def get_validator_querysets(
+        self, queryset: models.QuerySet
+    ) -> List[models.QuerySet]:
+        """
+        Return the querysets whose rows make up a detail response: `queryset`
+        first, followed by the rows of any embedded relation.
+        """
+        return [queryset]
+
+    def get_list_etag(self, request) -> Optional[str]:
+        """
+        Return the ETag of the current list request, None when the cache
+        versions it is built from are not shared by every process.
+        """
+        if not api_cache_is_shared():
+            return None
+        digest = hashlib.sha256(
+            self.get_response_cache_key(request).encode("utf-8")
+        ).hexdigest()
+        return f'W/"{digest}"'
+
+    def get_validators(
+        self, request, queryset: models.QuerySet
+    ) -> Tuple[Optional[str], Optional[datetime]]:
+        """
+        Return the `(etag, last_modified)` pair of the object in `queryset`.
+        Both are None when it is missing. There is no `last_modified` when
+        relations are embedded, as deleting a related row does not move it.
+        """
+        states = [
+            validator_queryset.aggregate(
+                last_modified=Max("updated_at"), count=Count("pk")
+            )
+            for validator_queryset in self.get_validator_querysets(queryset)
+        ]
+        if not states[0]["count"]:
+            return None, None
+        parts = (
+            request.path,
+            sorted(request.query_params.lists()),
+            request.accepted_media_type,
+            [(state["count"], state["last_modified"]) for state in states],
+        )
+        digest = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+        last_modified = states[0]["last_modified"] if len(states) == 1 else None
+        return f'W/"{digest}"', last_modified
+
+    def get_cached_validators(
+        self, request, queryset: models.QuerySet
+    ) -> Tuple[Optional[str], Optional[datetime]]:
+        """
+        Return the validators of `queryset`, computed once per cache version
+        when the cache is shared by every process.
+        """
+        if not api_cache_is_shared():
+            return self.get_validators(request, queryset)
+        cache = get_api_cache()
+        key = f"{self.get_response_cache_key(request)}:validators"
+        validators = cache.get(key)
+        record_cache_lookup("api_validators", validators is not None)
+        if validators is None:
+            validators = self.get_validators(request, queryset)
+            cache.set(key, validators, timeout=settings.API_CACHE_TIMEOUT)
+        return validators
+
+    def _conditional_response(
+        self, handler, request, etag, last_modified, *args, **kwargs
+    ) -> Response:
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        headers = {"ETag": etag}
+        timestamp = None
+        # Without a Last-Modified header If-Modified-Since is not honored.
+        if last_modified is not None:
+            timestamp = int(last_modified.timestamp())
+            headers["Last-Modified"] = http_date(timestamp)
+
+        if get_conditional_response(request, etag=etag, last_modified=timestamp):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            for header, value in headers.items():
+                response[header] = value
+        return response
+
+    def list(self, request, *args, **kwargs) -> Response:
+        etag = self.get_list_etag(request)
+        return self._conditional_response(
+            super().list, request, etag, None, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+        etag, last_modified = self.get_cached_validators(request, queryset)
+        return self._conditional_response(
+            super().retrieve, request, etag, last_modified, *args, **kwargs
+        )
+
+
+class ValuesListMixin:
+    """
+    Serve the list action of a model viewset from `.values()` dicts instead
+    of model instances and serializer fields.
+
+    The values are read for the `Meta.fields` of `serializer_class`, which
+    must all be concrete model fields (foreign keys yield their primary key,
+    as with PrimaryKeyRelatedField). Datetimes are converted to the current time
+    zone like DateTimeField does, so that the rendered output is identical.
+    Other actions keep using the serializer.
+    """
+
+    def get_values_fields(self) -> Sequence[str]:
+        """
+        Return the fields read for list responses.
+        """
+        return self.serializer_class.Meta.fields
+
+    def use_values_list(self) -> bool:
+        """
+        Return whether the current list request can be served from values.
+        """
+        return True
+
+    def to_values_representation(
+        self, rows: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Convert `.values()` rows to their serializer representation in place.
+        """
+        if not settings.USE_TZ:
+            return rows
+        opts = self.queryset.model._meta
+        datetime_fields = [
+            name
+            for name in self.get_values_fields()
+            if isinstance(opts.get_field(name), models.DateTimeField)
+        ]
+        current_timezone = timezone.get_current_timezone()
+        for row in rows:
+            for name in datetime_fields:
+                if row[name] is not None:
+                    row[name] = row[name].astimezone(current_timezone)
+        return rows
+
+    def list(self, request, *args, **kwargs) -> Response:
+        if not self.use_values_list():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *self.get_values_fields()
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                self.to_values_representation(list(page))
+            )
+        return Response(self.to_values_representation(list(queryset)))
+
+
+class ExportMixin(ValuesListMixin):
+    """
+    Add an `export` action streaming every filtered row of a model viewset
+    as NDJSON (`?format=ndjson`, the default) or CSV (`?format=csv`).
+
+    Rows are read with a server-side cursor in chunks of
+    `settings.EXPORT_CHUNK_SIZE`, so memory use does not grow with the
+    export. Under ASGI the response body is an async iterator.
+    """
+
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[NDJSONRenderer, CSVRenderer],
+        pagination_class=None,
+    )
+    def export(self, request, *args, **kwargs) -> StreamingHttpResponse:
+        """
+        Stream every row matching the filters of the list endpoint.
+        """
+        fields = self.get_values_fields()
+        queryset = self.filter_queryset(self.get_queryset()).values(*fields)
+        renderer = request.accepted_renderer
+        content = renderer.render_chunks(self._export_chunks(queryset), fields)
+        if isinstance(request._request, ASGIRequest):
+            content = _iterate_in_thread(content)
+
+        response = StreamingHttpResponse(content, content_type=renderer.media_type)
+        filename = f"{self.queryset.model._meta.model_name}s.{renderer.format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    def _export_chunks(
+        self, queryset: models.QuerySet
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield the rows of `queryset` in representation chunks.
+        """
+        chunk_size = settings.EXPORT_CHUNK_SIZE
+        rows = queryset.iterator(chunk_size=chunk_size)
+        while chunk := list(islice(rows, chunk_size)):
+            yield self.to_values_representation(chunk)
+
+
+async def _iterate_in_thread(iterator: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Consume a sync iterator doing database queries from async code.
+    """
+    done = object()
+    while (item := await sync_to_async(next)(iterator, done)) is not done:
+        yield item
+
+
+class BulkWriteMixin:
+    """
+    Add a `bulk` collection route to a model viewset, writing a JSON array
+    of objects in one transaction: POST creates, PATCH partially updates
+    (every item carries its `id`) and DELETE takes a list of ids.
+
+    The whole array is validated first; if any item is invalid nothing is
+    written and the response lists the errors of every item, in order. The
+    serializer's `Meta.list_serializer_class` must be a BulkListSerializer.
+    """
+
+    def get_bulk_max_items(self) -> int:
+        """
+        Return the maximum number of items accepted by one bulk request.
+        """
+        return settings.BULK_WRITE_MAX_ITEMS
+
+    @action(detail=False, methods=["post"], url_path="bulk", url_name="bulk")
+    def bulk_create(self, request, *args, **kwargs) -> Response:
+        """
+        Create every object of the array.
+        """
+        serializer = self.get_serializer(
+            data=request.data, many=True, max_length=self.get_bulk_max_items()
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save()
+        bump_cache_version(self.queryset.model)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request, *args, **kwargs) -> Response:
+        """
+        Partially update every object of the array, identified by its `id`.
+        """
+        serializer = self.get_serializer(
+            self.get_queryset(),
+            data=request.data,
+            many=True,
+            partial=True,
+            max_length=self.get_bulk_max_items(),
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            serializer.save()
+        bump_cache_version(self.queryset.model)
+        return Response(serializer.data)
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request, *args, **kwargs) -> Response:
+        """
+        Delete every object whose id is in the array.
+        """
+        ids = serializers.ListField(
+            child=serializers.IntegerField(),
+            allow_empty=False,
+            max_length=self.get_bulk_max_items(),
+        ).run_validation(request.data)
+        queryset = self.get_queryset().filter(pk__in=ids)
+        existing = set(queryset.values_list("pk", flat=True))
+        missing = {
+            index: ["Object not found."]
+            for index, pk in enumerate(ids)
+            if pk not in existing
+        }
+        if missing:
+            raise serializers.ValidationError(missing)
+
+        with transaction.atomic():
+            queryset.delete()
+        bump_cache_version(self.queryset.model)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class SyncRunViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    History of the synchronization runs, latest first.
+    """
+
+    serializer_class = SyncRunSerializer
+    queryset = SyncRun.objects.all()
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ["resource", "method", "outcome"]
+    ordering_fields = ["started_at", "duration_seconds"]
+
+
+@require_GET
+def metrics_view(request) -> HttpResponse:
+    """
+    Expose the Prometheus metrics of all worker processes.
+
+    Scrapes must send `METRICS_AUTH_TOKEN` as a bearer token, or come from a
+    staff session; without a token only staff can read the metrics.
+    """
+    token = settings.METRICS_AUTH_TOKEN
+    authorized = request.user.is_staff or (
+        token
+        and constant_time_compare(
+            request.headers.get("Authorization", ""), f"Bearer {token}"
+        )
+    )
+    if not authorized:
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+    return HttpResponse(
+        generate_latest(metrics_registry()), content_type=CONTENT_TYPE_LATEST
+    )
@@ -0,0 +1,494 @@
+import asyncio
+import io
+import json
+import math
+import queue
+import random
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from django.utils.crypto import get_random_string
+from faker import Faker
+
+from common.cache import bump_cache_version
+from common.queries import QueryCounter
+from content.models import Comment, Post
+
+# Title prefix of the seeded and created posts, deleted after the run.
+SEED_MARKER = "[bench_api]"
+
+SERVERS = ("wsgi", "asgi")
+SCENARIOS = ("list", "filter", "deep_page", "retrieve", "create")
+
+
+class _Request(NamedTuple):
+    method: str
+    path: str
+    query: str = ""
+    body: bytes = b""
+
+
+class Command(BaseCommand):
+    """
+    Django command benchmarking the content endpoints under concurrent load.
+
+    Posts and comments are seeded, a JWT is obtained from `/auth/token/`,
+    and list, filter, deep page, retrieve and create requests are sent to
+    the WSGI and ASGI applications of `backend` in-process, without a
+    network server. Throughput, latency percentiles and queries per request
+    of every server and scenario are written as JSON. The seeded rows and
+    user are deleted afterwards.
+    """
+
+    help = "Benchmark the content endpoints under concurrent load."
+
+    def add_arguments(self, parser) -> None:
+        """
+        Register the command line options.
+        """
+        parser.add_argument("--posts", type=int, default=1000, help="Seeded posts.")
+        parser.add_argument(
+            "--comments", type=int, default=10000, help="Seeded comments."
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Requests sent per server and scenario.",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=8, help="Requests in flight."
+        )
+        parser.add_argument(
+            "--server",
+            choices=SERVERS,
+            action="append",
+            help="Application to benchmark, repeatable (both by default).",
+        )
+        parser.add_argument(
+            "--scenario",
+            choices=SCENARIOS,
+            action="append",
+            help="Scenario to run, repeatable (all by default).",
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Disable the response cache (API_CACHE_TIMEOUT=0).",
+        )
+        parser.add_argument(
+            "--host", default="localhost", help="Host header, must be allowed."
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument(
+            "--output", help="Write the JSON results to this file instead of stdout."
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Main entry point for the command.
+        """
+        if options["posts"] < 1 or options["requests"] < 1:
+            raise CommandError("--posts and --requests must be positive.")
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be positive.")
+
+        servers = options["server"] or list(SERVERS)
+        scenarios = options["scenario"] or list(SCENARIOS)
+        results: Dict[str, Any] = {
+            "config": {
+                **{
+                    name: options[name]
+                    for name in (
+                        "posts",
+                        "comments",
+                        "requests",
+                        "concurrency",
+                        "no_cache",
+                        "seed",
+                    )
+                },
+                "servers": servers,
+                "scenarios": scenarios,
+                "debug": settings.DEBUG,
+            },
+            "runs": [],
+        }
+
+        username = f"bench_api_{get_random_string(8)}"
+        password = get_random_string(24)
+        User.objects.create_user(username=username, password=password)
+        cache_timeout = 0 if options["no_cache"] else settings.API_CACHE_TIMEOUT
+        try:
+            post_ids = _seed(options["posts"], options["comments"], options["seed"])
+            with override_settings(API_CACHE_TIMEOUT=cache_timeout):
+                for server in servers:
+                    bench = _Bench(server, options["host"])
+                    for scenario in scenarios:
+                        bench.authenticate(username, password)
+                        requests = _build_requests(
+                            scenario,
+                            post_ids,
+                            options["comments"],
+                            options["requests"],
+                            random.Random(options["seed"]),
+                        )
+                        results["runs"].append(
+                            bench.run(scenario, requests, options["concurrency"])
+                        )
+        finally:
+            _cleanup(username)
+
+        output = json.dumps(results, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+
+def _seed(posts: int, comments: int, seed: int) -> List[int]:
+    """
+    Insert marked posts and comments and return the post ids.
+    """
+    fake = Faker()
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+    sentences = [fake.sentence() for _ in range(200)]
+    paragraphs = [fake.paragraph(nb_sentences=4) for _ in range(200)]
+    names = [fake.name() for _ in range(200)]
+    emails = [fake.email() for _ in range(200)]
+
+    post_objects = [
+        Post(
+            user_id=rng.randint(1, 10),
+            title=f"{SEED_MARKER} {rng.choice(sentences)}",
+            body=rng.choice(paragraphs),
+        )
+        for _ in range(posts)
+    ]
+    for post in post_objects:
+        post.refresh_content_hash()
+    post_objects = Post.objects.bulk_create(post_objects, batch_size=2000)
+
+    comment_objects = [
+        Comment(
+            post=rng.choice(post_objects),
+            name=rng.choice(names),
+            email=rng.choice(emails),
+            body=rng.choice(paragraphs),
+        )
+        for _ in range(comments)
+    ]
+    for comment in comment_objects:
+        comment.refresh_content_hash()
+    Comment.objects.bulk_create(comment_objects, batch_size=2000)
+
+    bump_cache_version(Post)
+    bump_cache_version(Comment)
+    return [post.pk for post in post_objects]
+
+
+def _cleanup(username: str) -> None:
+    """
+    Delete the marked posts with their comments, and the benchmark user.
+    """
+    Comment.objects.filter(post__title__startswith=SEED_MARKER).delete()
+    Post.objects.filter(title__startswith=SEED_MARKER).delete()
+    User.objects.filter(username=username).delete()
+    bump_cache_version(Post)
+    bump_cache_version(Comment)
+
+
+def _build_requests(
+    scenario: str,
+    post_ids: List[int],
+    comments: int,
+    count: int,
+    rng: random.Random,
+) -> List[_Request]:
+    """
+    Return the requests of a scenario.
+
+    Deep pages are drawn from the last tenth of the comment pages, where
+    OFFSET pagination is the most expensive.
+    """
+    posts_path = "/api/v1/content/posts/"
+    comments_path = "/api/v1/content/comments/"
+    pages = max(1, math.ceil(comments / settings.REST_FRAMEWORK["PAGE_SIZE"]))
+
+    def make() -> _Request:
+        if scenario == "list":
+            return _Request("GET", posts_path)
+        if scenario == "filter":
+            return _Request(
+                "GET", comments_path, urlencode({"post": rng.choice(post_ids)})
+            )
+        if scenario == "deep_page":
+            page = rng.randint(max(1, pages - pages // 10), pages)
+            return _Request("GET", comments_path, urlencode({"page": page}))
+        if scenario == "retrieve":
+            return _Request("GET", f"{posts_path}{rng.choice(post_ids)}/")
+        body = {"title": f"{SEED_MARKER} created", "body": "Created by bench_api."}
+        return _Request("POST", posts_path, body=json.dumps(body).encode("utf-8"))
+
+    return [make() for _ in range(count)]
+
+
+class _QueryCounter(QueryCounter):
+    """
+    Count the queries of every connection opened while it is installed.
+
+    Connections are closed at the end of each request (CONN_MAX_AGE=0) and
+    ASGI requests run in their own threads, so the counter is added to the
+    execute wrappers of every new connection instead of a single one.
+    """
+
+    def __enter__(self) -> "_QueryCounter":
+        connection_created.connect(self._install)
+        self._install(connection=connection)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        connection_created.disconnect(self._install)
+        for conn in connections.all(initialized_only=True):
+            if self in conn.execute_wrappers:
+                conn.execute_wrappers.remove(self)
+
+    def _install(self, sender=None, connection=None, **kwargs) -> None:
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+class _Bench:
+    """
+    Send requests to the WSGI or ASGI application of the project.
+    """
+
+    def __init__(self, server: str, host: str) -> None:
+        self.server = server
+        self.host = host
+        self.token: Optional[str] = None
+        if server == "wsgi":
+            from backend.wsgi import application
+        else:
+            from backend.asgi import application
+        self.application = application
+
+    def authenticate(self, username: str, password: str) -> None:
+        """
+        Obtain a fresh access token, as they only last a few minutes.
+        """
+        body = json.dumps({"username": username, "password": password})
+        request = _Request("POST", "/auth/token/", body=body.encode("utf-8"))
+        self.token = None
+        status, content = self.send(request)
+        if status != 200:
+            raise CommandError(f"Obtaining a token failed with status {status}.")
+        self.token = json.loads(content)["access"]
+
+    def send(self, request: _Request) -> Tuple[int, bytes]:
+        """
+        Send a single request and return its status and body.
+        """
+        if self.server == "wsgi":
+            return _call_wsgi(self.application, request, self._headers(request))
+        return asyncio.run(
+            _call_asgi(self.application, request, self._headers(request))
+        )
+
+    def run(
+        self, scenario: str, requests: List[_Request], concurrency: int
+    ) -> Dict[str, Any]:
+        """
+        Send `requests` with `concurrency` requests in flight and return
+        the measurements. One unmeasured request warms the code paths up.
+        """
+        self.send(requests[0])
+        with _QueryCounter() as queries:
+            started = time.perf_counter()
+            if self.server == "wsgi":
+                samples = self._run_threads(requests, concurrency)
+            else:
+                samples = asyncio.run(self._run_tasks(requests, concurrency))
+            seconds = time.perf_counter() - started
+
+        latencies = sorted(latency for latency, _ in samples)
+        expected = 201 if scenario == "create" else 200
+        return {
+            "server": self.server,
+            "scenario": scenario,
+            "requests": len(samples),
+            "errors": sum(1 for _, status in samples if status != expected),
+            "seconds": round(seconds, 4),
+            "throughput_rps": round(len(samples) / seconds, 1),
+            "latency_ms": {
+                "p50": round(_percentile(latencies, 50) * 1000, 2),
+                "p90": round(_percentile(latencies, 90) * 1000, 2),
+                "p99": round(_percentile(latencies, 99) * 1000, 2),
+                "max": round(latencies[-1] * 1000, 2),
+            },
+            "queries_per_request": round(queries.count / len(samples), 2),
+        }
+
+    def _run_threads(
+        self, requests: List[_Request], concurrency: int
+    ) -> List[Tuple[float, int]]:
+        pending: "queue.SimpleQueue[_Request]" = queue.SimpleQueue()
+        for request in requests:
+            pending.put(request)
+        samples: List[Tuple[float, int]] = []
+
+        def work() -> None:
+            try:
+                while True:
+                    try:
+                        request = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    started = time.perf_counter()
+                    status, _ = _call_wsgi(
+                        self.application, request, self._headers(request)
+                    )
+                    samples.append((time.perf_counter() - started, status))
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=work) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return samples
+
+    async def _run_tasks(
+        self, requests: List[_Request], concurrency: int
+    ) -> List[Tuple[float, int]]:
+        pending = list(reversed(requests))
+        samples: List[Tuple[float, int]] = []
+
+        async def work() -> None:
+            while pending:
+                request = pending.pop()
+                started = time.perf_counter()
+                status, _ = await _call_asgi(
+                    self.application, request, self._headers(request)
+                )
+                samples.append((time.perf_counter() - started, status))
+
+        await asyncio.gather(*(work() for _ in range(concurrency)))
+        return samples
+
+    def _headers(self, request: _Request) -> Dict[str, str]:
+        headers = {"host": self.host, "accept": "application/json"}
+        if self.token:
+            headers["authorization"] = f"Bearer {self.token}"
+        if request.body:
+            headers["content-type"] = "application/json"
+            headers["content-length"] = str(len(request.body))
+        return headers
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    """
+    Return the nearest-rank percentile of sorted `values`.
+    """
+    index = max(0, math.ceil(percent / 100 * len(values)) - 1)
+    return values[index]
+
+
+def _call_wsgi(
+    application, request: _Request, headers: Dict[str, str]
+) -> Tuple[int, bytes]:
+    """
+    Call a WSGI application and return the response status and body.
+    """
+    environ = {
+        "REQUEST_METHOD": request.method,
+        "SCRIPT_NAME": "",
+        "PATH_INFO": request.path,
+        "QUERY_STRING": request.query,
+        "SERVER_NAME": headers["host"],
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "REMOTE_ADDR": "127.0.0.1",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(request.body),
+        "wsgi.errors": io.StringIO(),
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in headers.items():
+        if name in ("content-type", "content-length"):
+            environ[name.upper().replace("-", "_")] = value
+        else:
+            environ[f"HTTP_{name.upper().replace('-', '_')}"] = value
+
+    statuses: List[str] = []
+
+    def start_response(status, response_headers, exc_info=None):
+        statuses.append(status)
+        return lambda data: None
+
+    result = application(environ, start_response)
+    try:
+        content = b"".join(result)
+    finally:
+        # Sends request_finished, which closes the database connections.
+        if hasattr(result, "close"):
+            result.close()
+    return int(statuses[0].split()[0]), content
+
+
+async def _call_asgi(
+    application, request: _Request, headers: Dict[str, str]
+) -> Tuple[int, bytes]:
+    """
+    Call an ASGI application and return the response status and body.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": request.method,
+        "scheme": "http",
+        "path": request.path,
+        "raw_path": request.path.encode("ascii"),
+        "query_string": request.query.encode("ascii"),
+        "root_path": "",
+        "headers": [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers.items()
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": (headers["host"], 80),
+    }
+    body_sent = False
+    response: Dict[str, Any] = {"status": None, "body": []}
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": request.body, "more_body": False}
+        # The client never disconnects; the handler cancels this wait.
+        await asyncio.get_running_loop().create_future()
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    await application(scope, receive, send)
+    return response["status"], b"".join(response["body"])
@@ -0,0 +1,107 @@
+import time
+from typing import Callable, Type
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework import viewsets
+from rest_framework.renderers import JSONRenderer
+
+from common.renderers import ORJSONRenderer
+from content.models import Comment, Post
+from content.views import CommentViewSet, PostViewSet
+
+
+class Command(BaseCommand):
+    """
+    Django command comparing the serializer and `.values()` list paths.
+
+    Test rows are created in a transaction that is rolled back at the end.
+    """
+
+    help = "Benchmark list serialization through serializers vs. values()."
+
+    def add_arguments(self, parser) -> None:
+        """
+        Register the command line options.
+        """
+        parser.add_argument("--rows", type=int, default=1000, help="Rows per resource.")
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Runs per path; the best counts."
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Main entry point for the command.
+        """
+        with transaction.atomic():
+            self._create_rows(options["rows"])
+            for name, viewset_class in (
+                ("posts", PostViewSet),
+                ("comments", CommentViewSet),
+            ):
+                self._compare(name, viewset_class, options["repeat"])
+            transaction.set_rollback(True)
+
+    def _create_rows(self, count: int) -> None:
+        """
+        Create `count` posts with one comment each.
+        """
+        posts = Post.objects.bulk_create(
+            [
+                Post(external_id=i, title=f"Post {i}", body="Body " * 20)
+                for i in range(1, count + 1)
+            ]
+        )
+        Comment.objects.bulk_create(
+            [
+                Comment(
+                    external_id=post.external_id,
+                    post=post,
+                    name=f"Commenter {post.external_id}",
+                    email=f"user{post.external_id}@example.com",
+                    body="Comment " * 20,
+                )
+                for post in posts
+            ]
+        )
+
+    def _compare(
+        self, name: str, viewset_class: Type[viewsets.ModelViewSet], repeat: int
+    ) -> None:
+        """
+        Time both paths over every row of a resource and compare the output.
+        """
+        view = viewset_class()
+        queryset = view.get_queryset()
+        fields = view.get_values_fields()
+
+        def serializer_path() -> bytes:
+            data = view.get_serializer_class()(queryset.all(), many=True).data
+            return JSONRenderer().render(data)
+
+        def values_path() -> bytes:
+            rows = view.to_values_representation(list(queryset.values(*fields)))
+            return ORJSONRenderer().render(rows)
+
+        serializer_output, serializer_seconds = _best_of(serializer_path, repeat)
+        values_output, values_seconds = _best_of(values_path, repeat)
+        if serializer_output != values_output:
+            raise CommandError(f"The {name} outputs of both paths differ.")
+
+        self.stdout.write(
+            f"{name}: serializer {serializer_seconds * 1000:.1f}ms, "
+            f"values {values_seconds * 1000:.1f}ms, "
+            f"speedup {serializer_seconds / values_seconds:.1f}x"
+        )
+
+
+def _best_of(func: Callable[[], bytes], repeat: int) -> tuple[bytes, float]:
+    """
+    Call `func` `repeat` times and return its output with the best time.
+    """
+    best = float("inf")
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        output = func()
+        best = min(best, time.perf_counter() - started)
+    return output, best
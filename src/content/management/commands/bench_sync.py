@@ -0,0 +1,298 @@
+import json
+import random
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from faker import Faker
+
+from common.synchronizers import WRITE_STRATEGY_DIFF, WRITE_STRATEGY_UPSERT
+from common.testing import StubApiServer
+from content.utils.synchronizers import SYNC_SERVICES
+
+
+class Command(BaseCommand):
+    """
+    Django command benchmarking the synchronization of synthetic content.
+
+    Faker-generated posts and comments are served by a local stub API and
+    synchronized three times: a first load into empty tables, a resync of
+    unchanged data, and a resync after changing a share of the items. Wall
+    time, query count and peak RSS of every resource and phase are written
+    as JSON.
+
+    Everything runs in a transaction that is rolled back, and the tables are
+    emptied inside it. Batch transactions are therefore savepoints: the cost
+    of committing them, such as flushing the WAL, is not measured, which the
+    output states.
+    """
+
+    help = "Benchmark the synchronization of synthetic posts and comments."
+
+    def add_arguments(self, parser) -> None:
+        """
+        Register the command line options.
+        """
+        parser.add_argument("--posts", type=int, default=10000, help="Number of posts.")
+        parser.add_argument(
+            "--comments-per-post",
+            type=int,
+            default=5,
+            help="Number of comments of every post.",
+        )
+        parser.add_argument(
+            "--changed-percent",
+            type=float,
+            default=10.0,
+            help="Share of the items changed before the last resync.",
+        )
+        parser.add_argument(
+            "--write-strategy",
+            choices=[WRITE_STRATEGY_DIFF, WRITE_STRATEGY_UPSERT],
+            help="Write strategy of the services (SYNC_WRITE_STRATEGY by default).",
+        )
+        parser.add_argument(
+            "--bulk-load",
+            action="store_true",
+            help="Use bulk_load (COPY) for the first load.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, help="Items diffed and written per batch."
+        )
+        parser.add_argument("--page-size", type=int, help="Fetch the API page by page.")
+        parser.add_argument(
+            "--workers", type=int, help="Concurrent page requests per resource."
+        )
+        parser.add_argument(
+            "--stream", action="store_true", help="Parse responses incrementally."
+        )
+        parser.add_argument(
+            "--conditional",
+            action="store_true",
+            help="Send conditional requests, so unchanged resyncs get a 304.",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument(
+            "--output", help="Write the JSON results to this file instead of stdout."
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Main entry point for the command.
+        """
+        routes = _generate_payloads(
+            options["posts"], options["comments_per_post"], options["seed"]
+        )
+        results: Dict[str, Any] = {
+            "config": {
+                name: options[name]
+                for name in (
+                    "posts",
+                    "comments_per_post",
+                    "changed_percent",
+                    "write_strategy",
+                    "bulk_load",
+                    "batch_size",
+                    "page_size",
+                    "workers",
+                    "stream",
+                    "conditional",
+                    "seed",
+                )
+            },
+            "transaction": (
+                "rolled back: batches are committed as savepoints, so commit "
+                "and WAL flush costs are excluded"
+            ),
+            "runs": [],
+        }
+
+        with StubApiServer(routes) as server, transaction.atomic():
+            _empty_tables()
+            handler_options = {
+                "endpoint": server.url,
+                "page_size": options["page_size"],
+                "max_workers": options["workers"],
+                "stream": options["stream"],
+                "conditional": options["conditional"],
+            }
+            phases = [
+                ("first_load", None),
+                ("noop_resync", None),
+                ("changed_resync", options["changed_percent"]),
+            ]
+            for phase, changed_percent in phases:
+                if changed_percent:
+                    _change_items(routes, changed_percent, options["seed"])
+                for name, service_class in SYNC_SERVICES.items():
+                    service = service_class(
+                        batch_size=options["batch_size"],
+                        write_strategy=options["write_strategy"],
+                        handler_options=handler_options,
+                    )
+                    bulk_load = options["bulk_load"] and phase == "first_load"
+                    results["runs"].append(
+                        self._measure(phase, name, service, bulk_load)
+                    )
+            transaction.set_rollback(True)
+
+        output = json.dumps(results, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+    def _measure(
+        self, phase: str, name: str, service, bulk_load: bool
+    ) -> Dict[str, Any]:
+        """
+        Synchronize a resource and return its measurements.
+        """
+        with _count_queries() as queries, _RssSampler() as rss:
+            started = time.perf_counter()
+            if bulk_load:
+                inserted, updated = service.bulk_load()
+            else:
+                inserted, updated = service.synchronize()
+            seconds = time.perf_counter() - started
+        return {
+            "phase": phase,
+            "resource": name,
+            "seconds": round(seconds, 4),
+            "queries": queries["count"],
+            "peak_rss_mb": round(rss.peak / 2**20, 1),
+            "fetched": service.fetched_count,
+            "inserted": inserted,
+            "updated": updated,
+        }
+
+
+def _empty_tables() -> None:
+    """
+    Empty the tables of the synchronized models, so the first load inserts
+    every item.
+    """
+    quote = connection.ops.quote_name
+    tables = ", ".join(
+        quote(service_class.model._meta.db_table)
+        for service_class in SYNC_SERVICES.values()
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"TRUNCATE {tables}")
+
+
+def _generate_payloads(
+    posts: int, comments_per_post: int, seed: int
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Return JSONPlaceholder-like post and comment payloads.
+
+    Texts are drawn from a pool of Faker sentences, so that generating
+    millions of items stays fast.
+    """
+    fake = Faker()
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+    sentences = [fake.sentence() for _ in range(1000)]
+    paragraphs = [fake.paragraph(nb_sentences=4) for _ in range(1000)]
+    names = [fake.name() for _ in range(1000)]
+    emails = [fake.email() for _ in range(1000)]
+
+    post_items = [
+        {
+            "userId": rng.randint(1, 10),
+            "id": post_id,
+            "title": rng.choice(sentences),
+            "body": rng.choice(paragraphs),
+        }
+        for post_id in range(1, posts + 1)
+    ]
+    comment_items = [
+        {
+            "postId": post_id,
+            "id": (post_id - 1) * comments_per_post + index + 1,
+            "name": rng.choice(names),
+            "email": rng.choice(emails),
+            "body": rng.choice(paragraphs),
+        }
+        for post_id in range(1, posts + 1)
+        for index in range(comments_per_post)
+    ]
+    return {"posts": post_items, "comments": comment_items}
+
+
+def _change_items(
+    routes: Dict[str, List[Dict[str, Any]]], percent: float, seed: int
+) -> None:
+    """
+    Change the body of `percent` % of the items of every route in place.
+    """
+    rng = random.Random(seed)
+    for items in routes.values():
+        for item in rng.sample(items, round(len(items) * percent / 100)):
+            item["body"] = f"{item['body']} (edited)"
+
+
+@contextmanager
+def _count_queries() -> Iterator[Dict[str, int]]:
+    """
+    Count the queries run on the default connection, without recording them.
+    """
+    counter = {"count": 0}
+
+    def wrapper(execute, sql, params, many, context):
+        counter["count"] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield counter
+
+
+class _RssSampler:
+    """
+    Context manager sampling the resident set size of the process in a
+    background thread, to report the peak of a single block of code.
+    Falls back to the lifetime peak where /proc is unavailable.
+    """
+
+    interval = 0.02
+
+    def __init__(self) -> None:
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "_RssSampler":
+        if self._current() is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._thread is None:
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # Kilobytes on Linux, bytes on macOS.
+            self.peak = maxrss if sys.platform == "darwin" else maxrss * 1024
+            return
+        self._stop.set()
+        self._thread.join()
+
+    def _sample(self) -> None:
+        while True:
+            self.peak = max(self.peak, self._current() or 0)
+            if self._stop.wait(self.interval):
+                return
+
+    @staticmethod
+    def _current() -> Optional[int]:
+        try:
+            with open("/proc/self/statm", encoding="ascii") as statm:
+                return int(statm.read().split()[1]) * resource.getpagesize()
+        except OSError:
+            return None
@@ -1,29 +1,153 @@
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
 
-from content.utils.synchronizers import (
-    synchronize_comments_task,
-    synchronize_posts_task,
-)
+from common.synchronizers import BaseSyncService
+from content.utils.synchronizers import SYNC_SERVICES
 
 
 class Command(BaseCommand):
     """
     Django command to synchronize Posts and Comments from an external API.
+
+    All selected endpoints are fetched concurrently, while writes follow the
+    dependency order so posts are committed before the comments referencing
+    them are written.
     """
 
     help = "Synchronize Posts and Comments from an external API."
 
+    def add_arguments(self, parser) -> None:
+        """
+        Register the command line options.
+        """
+        parser.add_argument(
+            "--bulk-load",
+            action="store_true",
+            help="Load all items with COPY and a set-based upsert "
+            "(initial or disaster-recovery loads).",
+        )
+        parser.add_argument(
+            "--only",
+            action="append",
+            choices=list(SYNC_SERVICES),
+            help="Resource to synchronize; can be repeated. Defaults to all.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Concurrent page requests per resource (requires --page-size).",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            help="Fetch every resource page by page with this many items.",
+        )
+        parser.add_argument(
+            "--conditional",
+            action="store_true",
+            help="Send conditional requests and skip resources that did not "
+            "change since the last run.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Number of items diffed and written per transaction.",
+        )
+
     def handle(self, *args, **options) -> None:
         """
         Main entry point for the command.
         """
+        handler_options = {}
+        if options["page_size"]:
+            handler_options["page_size"] = options["page_size"]
+        if options["workers"]:
+            handler_options["max_workers"] = options["workers"]
+        if options["conditional"]:
+            handler_options["conditional"] = True
+        services = {
+            name: service_class(
+                batch_size=options["batch_size"], handler_options=handler_options
+            )
+            for name, service_class in SYNC_SERVICES.items()
+            if not options["only"] or name in options["only"]
+        }
+        timings: List[Tuple[str, float]] = []
 
         try:
-            synchronize_posts_task()
-            self.stdout.write(self.style.SUCCESS("Posts synchronized successfully."))
-
-            synchronize_comments_task()
-            self.stdout.write(self.style.SUCCESS("Comments synchronized successfully."))
-
+            if options["bulk_load"]:
+                self._bulk_load(services, timings)
+            else:
+                self._synchronize(services, timings)
         except Exception as error:
             raise CommandError(f"Command stopped due to an unexpected error: {error}")
+
+        for stage, seconds in timings:
+            self.stdout.write(f"{stage}: {seconds:.2f}s")
+
+    def _synchronize(
+        self, services: Dict[str, BaseSyncService], timings: List[Tuple[str, float]]
+    ) -> None:
+        """
+        Fetch every resource concurrently and write them in dependency order.
+        """
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(services)) as executor:
+            fetches = {
+                name: executor.submit(_timed, _fetch_all, service)
+                for name, service in services.items()
+            }
+            for name, service in services.items():
+                (handler, items), fetch_seconds = fetches[name].result()
+                timings.append((f"{name} fetch", fetch_seconds))
+
+                with service.record_run("synchronize", handler) as run:
+                    run["counts"], write_seconds = _timed(service.write, handler, items)
+                timings.append((f"{name} write", write_seconds))
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"{name.capitalize()} synchronized successfully."
+                    )
+                )
+        timings.append(("total", time.perf_counter() - started))
+
+    def _bulk_load(
+        self, services: Dict[str, BaseSyncService], timings: List[Tuple[str, float]]
+    ) -> None:
+        """
+        Bulk load every resource with COPY, one after another.
+        """
+        started = time.perf_counter()
+        for name, service in services.items():
+            _, seconds = _timed(service.bulk_load)
+            timings.append((f"{name} bulk load", seconds))
+            self.stdout.write(
+                self.style.SUCCESS(f"{name.capitalize()} synchronized successfully.")
+            )
+        timings.append(("total", time.perf_counter() - started))
+
+
+def _fetch_all(service: BaseSyncService) -> Tuple[Any, Sequence]:
+    """
+    Fetch a resource and load its items in memory. The connection of the
+    fetching thread, used to read the stored validators, is closed after.
+    """
+    try:
+        handler, items = service.fetch()
+        return handler, items if isinstance(items, Sequence) else list(items)
+    finally:
+        connection.close()
+
+
+def _timed(func: Callable, *args: Any) -> Tuple[Any, float]:
+    """
+    Call `func` and return its result with the elapsed seconds.
+    """
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
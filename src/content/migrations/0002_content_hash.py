@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("content", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="content_hash",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=64
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="content_hash",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=64
+            ),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:37
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Build the indexes without locking writes on large tables.
+    atomic = False
+
+    dependencies = [
+        ("content", "0002_content_hash"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="comment",
+            index=models.Index(
+                fields=["created_at"], name="content_comment_created_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="comment",
+            index=models.Index(
+                condition=models.Q(("external_id__isnull", False)),
+                fields=["post", "external_id"],
+                name="content_comment_post_ext_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="comment",
+            index=models.Index(
+                condition=models.Q(("external_id__isnull", True)),
+                fields=["post", "id"],
+                name="content_comment_unkeyed_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="post",
+            index=models.Index(fields=["created_at"], name="content_post_created_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="post",
+            index=models.Index(
+                fields=["user_id", "external_id"], name="content_post_user_ext_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("external_id__isnull", True)),
+                fields=["id"],
+                name="content_post_unkeyed_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:59
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Adding a stored generated column rewrites content_post and
+    # content_comment under an ACCESS EXCLUSIVE lock, blocking reads and
+    # writes for the duration of the rewrite whatever `atomic` is. Only the
+    # GIN index builds, which run concurrently outside a transaction, leave
+    # the tables writable.
+    atomic = False
+
+    dependencies = [
+        ("content", "0003_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.SearchVector(
+                        "name", config="english", weight="A"
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        "body", config="english", weight="B"
+                    ),
+                    django.contrib.postgres.search.SearchConfig("english"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.SearchVector(
+                        "title", config="english", weight="A"
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        "body", config="english", weight="B"
+                    ),
+                    django.contrib.postgres.search.SearchConfig("english"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="comment",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="content_comment_search_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="post",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="content_post_search_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+from common.models import compute_content_hash
+
+# `hash_fields` of the models when content_hash was added; historical models
+# have no class attributes.
+HASH_FIELDS = {
+    "post": ("title", "body"),
+    "comment": ("name", "email", "body", "post_id"),
+}
+BATCH_SIZE = 1000
+
+
+def backfill_content_hash(apps, schema_editor) -> None:
+    """
+    Hash the rows stored before content_hash existed, so that the first
+    synchronization after this migration does not rewrite every row.
+    Batches are committed one by one.
+    """
+    for model_name, fields in HASH_FIELDS.items():
+        model = apps.get_model("content", model_name)
+        unhashed = model.objects.filter(content_hash="").order_by("pk")
+        last_pk = 0
+        while True:
+            batch = list(unhashed.filter(pk__gt=last_pk)[:BATCH_SIZE])
+            if not batch:
+                break
+            for obj in batch:
+                obj.content_hash = compute_content_hash(
+                    {field: getattr(obj, field) for field in fields}
+                )
+            model.objects.bulk_update(batch, ["content_hash"])
+            last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("content", "0004_search_vectors"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
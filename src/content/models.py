@@ -1,7 +1,9 @@
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 
-from common.models import BaseAppModel
+from common.models import SEARCH_CONFIG, BaseAppModel
 
 
 def default_user_id() -> int:
@@ -20,12 +22,39 @@ class Post(BaseAppModel):
         user_id (PositiveIntegerField): The ID of the user who created the post.
         title (CharField): The title of the post (max 255 characters).
         body (TextField): The content/body of the post.
+        search_vector (GeneratedField): Weighted full-text vector of the title
+            and body, computed by the database.
     """
 
     external_id = models.PositiveIntegerField(unique=True, blank=True, null=True)
     user_id = models.PositiveIntegerField(default=default_user_id)
     title = models.CharField(max_length=255)
     body = models.TextField()
+    search_vector = models.GeneratedField(
+        expression=SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("body", weight="B", config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    hash_fields = ("title", "body")
+
+    class Meta(BaseAppModel.Meta):
+        indexes = [
+            *BaseAppModel.Meta.indexes,
+            # Posts of a user ordered by external_id (?user_id=).
+            models.Index(
+                fields=["user_id", "external_id"], name="content_post_user_ext_idx"
+            ),
+            # Keyset pages over posts without an external_id.
+            models.Index(
+                fields=["id"],
+                name="content_post_unkeyed_idx",
+                condition=models.Q(external_id__isnull=True),
+            ),
+            # Full-text search (?search=).
+            GinIndex(fields=["search_vector"], name="content_post_search_idx"),
+        ]
 
     def __str__(self) -> str:
         """
@@ -44,15 +73,44 @@ class Comment(BaseAppModel):
         email (EmailField): The email address of the commenter.
         body (TextField): The content of the comment.
         post (ForeignKey): The related Post this comment belongs to.
+        search_vector (GeneratedField): Weighted full-text vector of the name
+            and body, computed by the database.
     """
 
     external_id = models.PositiveIntegerField(unique=True, blank=True, null=True)
     name = models.CharField(max_length=255)
     email = models.EmailField()
     body = models.TextField()
+    search_vector = models.GeneratedField(
+        expression=SearchVector("name", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("body", weight="B", config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments")
 
+    hash_fields = ("name", "email", "body", "post_id")
+
+    class Meta(BaseAppModel.Meta):
+        indexes = [
+            *BaseAppModel.Meta.indexes,
+            # Comments of a post ordered by external_id (?post=).
+            models.Index(
+                fields=["post", "external_id"],
+                name="content_comment_post_ext_idx",
+                condition=models.Q(external_id__isnull=False),
+            ),
+            # Keyset pages over comments of a post without an external_id.
+            models.Index(
+                fields=["post", "id"],
+                name="content_comment_unkeyed_idx",
+                condition=models.Q(external_id__isnull=True),
+            ),
+            # Full-text search (?search=).
+            GinIndex(fields=["search_vector"], name="content_comment_search_idx"),
+        ]
+
     def __str__(self) -> str:
         """
         Return a string representation of the Comment.
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from common.serializers import BulkListSerializer, BulkPrimaryKeyRelatedField
+
 from .models import Comment, Post
 
 
@@ -13,6 +15,7 @@ class PostSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Post
+        list_serializer_class = BulkListSerializer
         fields = (
             "id",
             "external_id",
@@ -39,8 +42,11 @@ class CommentSerializer(serializers.ModelSerializer):
     used for API responses and requests.
     """
 
+    serializer_related_field = BulkPrimaryKeyRelatedField
+
     class Meta:
         model = Comment
+        list_serializer_class = BulkListSerializer
         fields = (
             "id",
             "external_id",
@@ -57,3 +63,17 @@ class CommentSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         )
+
+
+class PostWithCommentsSerializer(PostSerializer):
+    """
+    Serializer for a Post embedding its comments.
+
+    Reads the `included_comments` prefetched by the view, which may be
+    limited to the first comments of each post.
+    """
+
+    comments = CommentSerializer(source="included_comments", many=True, read_only=True)
+
+    class Meta(PostSerializer.Meta):
+        fields = (*PostSerializer.Meta.fields, "comments")
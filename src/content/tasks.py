@@ -0,0 +1,151 @@
+import logging
+import math
+import uuid
+from typing import Any, Dict, List, Optional
+
+from celery import chain, chord, shared_task
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.exceptions import ImproperlyConfigured
+
+from common.cache import is_shared_cache
+from common.services import Validators, store_validators
+from content.utils.synchronizers import SYNC_SERVICES
+
+logger = logging.getLogger(__name__)
+
+SYNC_LOCK_KEY = "content-sync-lock"
+
+
+@shared_task
+def synchronize_chunk_task(resource: str, page: int, page_size: int) -> List[int]:
+    """
+    Synchronize a single page of a resource and return its counts.
+    """
+    service = SYNC_SERVICES[resource](handler_options={"page_size": page_size})
+    inserted_count, updated_count = service.synchronize_page(page)
+    return [inserted_count, updated_count]
+
+
+@shared_task
+def aggregate_sync_counts_task(results: List[List[int]], resource: str) -> Dict:
+    """
+    Sum the inserted/updated counts returned by the chunk tasks of a resource.
+    """
+    inserted_count = sum(inserted for inserted, _ in results)
+    updated_count = sum(updated for _, updated in results)
+    logger.info(f"{inserted_count} '{resource}' inserted in {len(results)} chunks.")
+    logger.info(f"{updated_count} '{resource}' updated in {len(results)} chunks.")
+    return {"resource": resource, "inserted": inserted_count, "updated": updated_count}
+
+
+@shared_task
+def synchronize_resource_task(resource: str) -> Dict:
+    """
+    Synchronize a whole resource in a single task.
+    Used when the API does not report how many items it holds.
+    """
+    inserted_count, updated_count = SYNC_SERVICES[resource]().synchronize()
+    return {"resource": resource, "inserted": inserted_count, "updated": updated_count}
+
+
+@shared_task
+def save_validators_task(result: Any, validators: Validators) -> Any:
+    """
+    Save the validators of a synchronized resource and pass its result on.
+    """
+    store_validators(validators)
+    return result
+
+
+@shared_task
+def release_sync_lock_task(*args: Any, token: str) -> None:
+    """
+    Release the synchronization lock if it is still held by `token`.
+    """
+    if cache.get(SYNC_LOCK_KEY) == token:
+        cache.delete(SYNC_LOCK_KEY)
+
+
+def check_workflow_backends() -> None:
+    """
+    Raise ImproperlyConfigured unless the lock cache and the result backend
+    are shared by every worker. Eager runs stay in one process and need
+    neither.
+    """
+    if settings.CELERY_TASK_ALWAYS_EAGER:
+        return
+    if not is_shared_cache(caches["default"]):
+        raise ImproperlyConfigured(
+            "The content synchronization lock needs a cache shared by all "
+            "workers; set CACHE_URL, e.g. rediscache://redis:6379/1."
+        )
+    if not settings.CELERY_RESULT_BACKEND:
+        raise ImproperlyConfigured(
+            "The content synchronization chords need a result backend; set "
+            "CELERY_RESULT_BACKEND, e.g. redis://redis:6379/2."
+        )
+
+
+def build_resource_workflow(resource: str, page_size: int):
+    """
+    Build a chord of one chunk task per page of a resource whose callback
+    aggregates the counts. Falls back to a single task without a total count.
+
+    A conditional request for the whole resource is sent first. Returns None
+    when it did not change; otherwise its validators are saved once the
+    resource is synchronized.
+    """
+    handler = SYNC_SERVICES[resource].handler_class(
+        page_size=page_size, conditional=True
+    )
+    if not handler.probe_items():
+        logger.info(f"'{resource}' not modified, synchronization skipped.")
+        return None
+    save_validators = save_validators_task.s(handler.pending_validators)
+
+    total_count: Optional[int] = handler.count_items()
+    if total_count is None:
+        return synchronize_resource_task.si(resource) | save_validators
+
+    pages = range(1, max(math.ceil(total_count / page_size), 1) + 1)
+    return (
+        chord(
+            (synchronize_chunk_task.si(resource, page, page_size) for page in pages),
+            aggregate_sync_counts_task.s(resource),
+        )
+        | save_validators
+    )
+
+
+@shared_task
+def synchronize_external_content_task(page_size: Optional[int] = None) -> Dict:
+    """
+    Fan out the synchronization of every resource into chunk tasks.
+
+    Resources run one after another in dependency order so posts exist
+    before their comments are written. A cache lock prevents overlapping
+    runs; it is released by the last task or expires after
+    settings.SYNC_LOCK_TIMEOUT seconds.
+    """
+    check_workflow_backends()
+    token = uuid.uuid4().hex
+    if not cache.add(SYNC_LOCK_KEY, token, timeout=settings.SYNC_LOCK_TIMEOUT):
+        logger.info("Content synchronization already running, skipped.")
+        return {"status": "skipped"}
+
+    try:
+        page_size = page_size or settings.SYNC_CHUNK_SIZE
+        workflows = (
+            build_resource_workflow(resource, page_size) for resource in SYNC_SERVICES
+        )
+        workflow = chain(
+            *(workflow for workflow in workflows if workflow is not None),
+            release_sync_lock_task.s(token=token),
+        )
+    except Exception:
+        cache.delete(SYNC_LOCK_KEY)
+        raise
+
+    workflow.apply_async(link_error=release_sync_lock_task.si(token=token))
+    return {"status": "started"}
@@ -2,6 +2,7 @@ from typing import List
 
 import pytest
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
 from common.services import FakeApiRequestsHandler
@@ -9,6 +10,14 @@ from content.models import Comment, Post
 from content.tests.payloads import COMMENTS_PAYLOAD, POSTS_PAYLOAD
 
 
+@pytest.fixture(autouse=True)
+def clear_cache() -> None:
+    """
+    Start every test with an empty cache.
+    """
+    cache.clear()
+
+
 @pytest.fixture
 def api_client() -> APIClient:
     """
@@ -0,0 +1,142 @@
+from typing import List
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from content.models import Comment, Post
+
+
+@pytest.mark.django_db
+class TestBulkWrites:
+    """
+    Tests for the bulk create/update/delete route of the content endpoints.
+    """
+
+    def test_bulk_create_comments_with_constant_queries(
+        self, auth_client: APIClient, posts: List[Post], django_assert_num_queries
+    ) -> None:
+        """
+        Posts referenced by the comments are loaded with a single query and
+        all comments are inserted with one statement.
+        """
+        payload = [
+            {
+                "post": posts[i % 3].id,
+                "name": f"Name {i}",
+                "email": f"user{i}@example.com",
+                "body": "Body",
+            }
+            for i in range(30)
+        ]
+
+        # Post lookup, savepoint, insert, savepoint release.
+        with django_assert_num_queries(4):
+            response = auth_client.post(reverse("comment-bulk"), payload, format="json")
+
+        assert response.status_code == 201
+        assert len(response.data) == 30
+        comment = Comment.objects.get(pk=response.data[0]["id"])
+        assert comment.post_id == posts[0].id
+        assert comment.content_hash
+
+    def test_bulk_create_reports_errors_per_item(
+        self, auth_client: APIClient, posts: List[Post]
+    ) -> None:
+        """
+        When any item is invalid nothing is created and errors are listed
+        in the order of the items.
+        """
+        payload = [
+            {"post": posts[0].id, "name": "Ok", "email": "a@b.com", "body": "B"},
+            {"post": 0, "name": "Bad post", "email": "a@b.com", "body": "B"},
+            {"post": "x", "name": "Bad", "email": "not-an-email", "body": "B"},
+        ]
+
+        response = auth_client.post(reverse("comment-bulk"), payload, format="json")
+
+        assert response.status_code == 400
+        assert response.data[0] == {}
+        assert list(response.data[1]) == ["post"]
+        assert set(response.data[2]) == {"post", "email"}
+        assert not Comment.objects.exists()
+
+    def test_bulk_update_posts(
+        self, auth_client: APIClient, posts: List[Post], django_assert_num_queries
+    ) -> None:
+        """
+        Items are matched by id with one query and written with one update.
+        """
+        payload = [{"id": post.id, "title": f"Changed {post.id}"} for post in posts[:2]]
+        before = posts[0].updated_at
+
+        # Post lookup, savepoint, update, savepoint release.
+        with django_assert_num_queries(4):
+            response = auth_client.patch(reverse("post-bulk"), payload, format="json")
+
+        assert response.status_code == 200
+        posts[0].refresh_from_db()
+        assert posts[0].title == f"Changed {posts[0].id}"
+        assert posts[0].body == "Some body"
+        assert posts[0].updated_at > before
+        expected = Post(title=posts[0].title, body=posts[0].body)
+        expected.refresh_content_hash()
+        assert posts[0].content_hash == expected.content_hash
+
+    def test_bulk_update_reports_unknown_ids(
+        self, auth_client: APIClient, posts: List[Post]
+    ) -> None:
+        """
+        Items without a known id are reported and nothing is updated.
+        """
+        payload = [{"id": posts[0].id, "title": "Changed"}, {"title": "No id"}]
+
+        response = auth_client.patch(reverse("post-bulk"), payload, format="json")
+
+        assert response.status_code == 400
+        assert response.data[1] == {"id": ["Object not found."]}
+        posts[0].refresh_from_db()
+        assert posts[0].title == "Post 1"
+
+    def test_bulk_delete(self, auth_client: APIClient, posts: List[Post]) -> None:
+        """
+        Every listed object is deleted, unless one of them does not exist.
+        """
+        url = reverse("post-bulk")
+        response = auth_client.delete(url, [posts[0].id, 0], format="json")
+        assert response.status_code == 400
+        assert response.data == {1: ["Object not found."]}
+
+        response = auth_client.delete(url, [posts[0].id, posts[1].id], format="json")
+
+        assert response.status_code == 204
+        assert list(Post.objects.values_list("id", flat=True)) == [posts[2].id]
+
+    def test_bulk_writes_invalidate_cached_lists(
+        self, auth_client: APIClient, posts: List[Post]
+    ) -> None:
+        """
+        Cached list responses are refreshed after a bulk write.
+        """
+        url = reverse("post-list")
+        auth_client.get(url)
+
+        auth_client.post(
+            reverse("post-bulk"), [{"title": "New", "body": "B"}], format="json"
+        )
+
+        assert auth_client.get(url).data["count"] == 4
+
+    def test_bulk_rejects_too_many_items(
+        self, auth_client: APIClient, settings
+    ) -> None:
+        """
+        Requests over BULK_WRITE_MAX_ITEMS are rejected.
+        """
+        settings.BULK_WRITE_MAX_ITEMS = 1
+        payload = [{"title": "A", "body": "B"}, {"title": "C", "body": "D"}]
+
+        response = auth_client.post(reverse("post-bulk"), payload, format="json")
+
+        assert response.status_code == 400
+        assert not Post.objects.exists()
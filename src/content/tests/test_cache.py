@@ -0,0 +1,113 @@
+from typing import List
+
+import pytest
+from django.core import checks
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from content.models import Comment, Post
+from content.utils.synchronizers import PostSyncService
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+    """
+    Tests for the cached list and retrieve responses of the content API.
+    """
+
+    def test_repeated_list_is_served_from_cache(
+        self, auth_client: APIClient, posts: List[Post], django_assert_num_queries
+    ) -> None:
+        """
+        A repeated list request returns the same data without hitting the DB.
+        """
+        url = reverse("post-list")
+        first = auth_client.get(url)
+
+        with django_assert_num_queries(0):
+            second = auth_client.get(url)
+
+        assert second.status_code == 200
+        assert second.data == first.data
+
+    def test_query_params_are_part_of_the_key(
+        self, auth_client: APIClient, posts: List[Post]
+    ) -> None:
+        """
+        Requests with different filters are cached separately.
+        """
+        url = reverse("post-list")
+        auth_client.get(url)
+
+        response = auth_client.get(url, {"external_id": posts[0].external_id})
+
+        assert [post["id"] for post in response.data["results"]] == [posts[0].id]
+
+    def test_api_writes_invalidate_cache(
+        self, auth_client: APIClient, posts: List[Post]
+    ) -> None:
+        """
+        Creating, updating and deleting through the API drops cached responses.
+        """
+        list_url = reverse("post-list")
+        detail_url = reverse("post-detail", args=[posts[0].id])
+        auth_client.get(list_url)
+        auth_client.get(detail_url)
+
+        auth_client.post(list_url, {"title": "New", "body": "Body"}, format="json")
+        assert auth_client.get(list_url).data["count"] == 4
+
+        auth_client.patch(detail_url, {"title": "Changed"}, format="json")
+        assert auth_client.get(detail_url).data["title"] == "Changed"
+
+        auth_client.delete(detail_url)
+        assert auth_client.get(detail_url).status_code == 404
+
+    def test_post_delete_invalidates_comment_responses(
+        self, auth_client: APIClient, comments: List[Comment]
+    ) -> None:
+        """
+        Comments removed by a cascading post delete disappear from the cache.
+        """
+        url = reverse("comment-list")
+        assert auth_client.get(url).data["count"] == 3
+
+        auth_client.delete(reverse("post-detail", args=[comments[0].post_id]))
+
+        assert auth_client.get(url).data["count"] == 0
+
+    def test_synchronization_invalidates_cache(
+        self, auth_client: APIClient, posts_payload: List[dict]
+    ) -> None:
+        """
+        Rows written by a synchronization show up in the next response.
+        """
+        url = reverse("post-list")
+        assert auth_client.get(url).data["count"] == 0
+
+        PostSyncService()._bulk_sync(posts_payload)
+
+        assert auth_client.get(url).data["count"] == len(posts_payload)
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_process_local_cache_is_not_used(
+        self, auth_client: APIClient, posts: List[Post]
+    ) -> None:
+        """
+        A per-process cache could not be invalidated by the other processes,
+        so responses are not cached and the system check warns about it.
+        """
+        url = reverse("post-list")
+        auth_client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = auth_client.get(url)
+
+        assert response.status_code == 200
+        assert len(queries) > 0
+        assert "common.W001" in [message.id for message in checks.run_checks()]
@@ -0,0 +1,188 @@
+import json
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+
+from common.testing import StubApiServer
+from content.models import Comment, Post
+from content.utils.services import CommentApiClient, PostApiClient
+
+
+@pytest.mark.django_db
+class TestSynchronizeExternalContentCommand:
+    """
+    Tests for the synchronize_external_content management command.
+    """
+
+    def _call(self, server: StubApiServer, *args: str) -> str:
+        """
+        Run the command against the stub server and return its output.
+        """
+        out = StringIO()
+        with patch.object(PostApiClient, "API_ENDPOINT", server.url), patch.object(
+            CommentApiClient, "API_ENDPOINT", server.url
+        ):
+            call_command("synchronize_external_content", *args, stdout=out)
+        return out.getvalue()
+
+    def test_synchronizes_posts_and_comments(
+        self, posts_payload, comments_payload
+    ) -> None:
+        """
+        Posts and comments are written and per-stage timings are reported.
+        """
+        routes = {"posts": posts_payload, "comments": comments_payload}
+        with StubApiServer(routes, delay=0.2) as server:
+            output = self._call(server, "--page-size", "1", "--workers", "2")
+
+        assert Post.objects.count() == len(posts_payload)
+        assert Comment.objects.filter(post__external_id=1).count() == 2
+        for stage in ("posts fetch", "posts write", "comments fetch", "total"):
+            assert f"{stage}: " in output
+        # Both endpoints are fetched concurrently, not one after the other.
+        posts = [w for w in server.windows if w[0] == "/posts"]
+        comments = [w for w in server.windows if w[0] == "/comments"]
+        assert any(
+            post_start < comment_end and comment_start < post_end
+            for _, post_start, post_end in posts
+            for _, comment_start, comment_end in comments
+        )
+
+    def test_only_selected_resources(self, posts_payload, comments_payload) -> None:
+        """
+        --only restricts the command to the given resources.
+        """
+        routes = {"posts": posts_payload, "comments": comments_payload}
+        with StubApiServer(routes) as server:
+            output = self._call(server, "--only", "posts", "--batch-size", "1")
+            assert all(r.path.startswith("/posts") for r in server.requests)
+
+        assert Post.objects.count() == len(posts_payload)
+        assert not Comment.objects.exists()
+        assert "comments" not in output
+
+    @pytest.mark.django_db(transaction=True)
+    def test_conditional_requests_are_opt_in(self, posts_payload) -> None:
+        """
+        Validators are only sent back with --conditional.
+        """
+        with StubApiServer({"posts": posts_payload}) as server:
+            self._call(server, "--only", "posts")
+            self._call(server, "--only", "posts")
+            self._call(server, "--only", "posts", "--conditional")
+            output = self._call(server, "--only", "posts", "--conditional")
+
+        headers = [request.headers for request in server.requests]
+        assert not any("If-None-Match" in header for header in headers[:3])
+        assert headers[3]["If-None-Match"]
+        assert "Posts synchronized successfully." in output
+
+    def test_unexpected_error_raises_command_error(self) -> None:
+        """
+        Errors are reported as a CommandError.
+        """
+        with patch(
+            "content.utils.synchronizers.PostSyncService.fetch",
+            side_effect=ValueError("boom"),
+        ):
+            with pytest.raises(CommandError, match="boom"):
+                call_command("synchronize_external_content", stdout=StringIO())
+
+
+@pytest.mark.django_db
+class TestBenchSyncCommand:
+    """
+    Tests for the bench_sync management command.
+    """
+
+    @pytest.mark.parametrize("write_strategy", ["diff", "upsert"])
+    def test_reports_every_phase_as_json(self, write_strategy: str) -> None:
+        """
+        Each phase reports its counts and measurements into emptied tables,
+        and nothing is changed.
+        """
+        Post.objects.create(external_id=1, title="Stored title", body="Stored body")
+        out = StringIO()
+        call_command(
+            "bench_sync",
+            "--posts",
+            "20",
+            "--comments-per-post",
+            "2",
+            "--changed-percent",
+            "50",
+            "--write-strategy",
+            write_strategy,
+            stdout=out,
+        )
+
+        results = json.loads(out.getvalue())
+        runs = {(run["phase"], run["resource"]): run for run in results["runs"]}
+        assert results["config"]["posts"] == 20
+        assert "commit and WAL flush costs are excluded" in results["transaction"]
+        assert runs["first_load", "posts"]["inserted"] == 20
+        assert runs["first_load", "comments"]["inserted"] == 40
+        assert runs["noop_resync", "comments"]["fetched"] == 40
+        assert (
+            runs["noop_resync", "comments"]["inserted"],
+            runs["noop_resync", "comments"]["updated"],
+        ) == (0, 0)
+        assert runs["changed_resync", "posts"]["updated"] == 10
+        assert runs["changed_resync", "comments"]["updated"] == 20
+        for run in results["runs"]:
+            assert run["queries"] > 0
+            assert run["seconds"] > 0
+            assert run["peak_rss_mb"] > 0
+        assert Post.objects.get().title == "Stored title"
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBenchApiCommand:
+    """
+    Tests for the bench_api management command.
+    """
+
+    def test_reports_every_server_and_scenario_as_json(self) -> None:
+        """
+        Every scenario succeeds on both applications, and nothing is kept.
+        """
+        out = StringIO()
+        call_command(
+            "bench_api",
+            "--posts",
+            "10",
+            "--comments",
+            "30",
+            "--requests",
+            "6",
+            "--concurrency",
+            "2",
+            stdout=out,
+        )
+
+        results = json.loads(out.getvalue())
+        runs = {(run["server"], run["scenario"]): run for run in results["runs"]}
+        assert set(runs) == {
+            (server, scenario)
+            for server in ("wsgi", "asgi")
+            for scenario in ("list", "filter", "deep_page", "retrieve", "create")
+        }
+        for run in runs.values():
+            assert run["requests"] == 6
+            assert run["errors"] == 0
+            assert run["throughput_rps"] > 0
+            assert run["latency_ms"]["p50"] <= run["latency_ms"]["p99"]
+            assert run["queries_per_request"] >= 1
+        assert not Post.objects.exists()
+        assert not Comment.objects.exists()
+        assert not User.objects.exists()
+
+    def test_rejects_invalid_concurrency(self) -> None:
+        """
+        A concurrency below one is refused before seeding anything.
+        """
+        with pytest.raises(CommandError, match="concurrency"):
+            call_command("bench_api", "--concurrency", "0", stdout=StringIO())
@@ -0,0 +1,145 @@
+from typing import List
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from content.models import Comment, Post
+from content.utils.synchronizers import PostSyncService
+
+
+@pytest.mark.django_db
+class TestConditionalRequests:
+    """
+    Tests for the ETag and Last-Modified validators of the content API.
+    """
+
+    def test_list_answers_if_none_match_with_304(
+        self, auth_client: APIClient, posts: List[Post], django_assert_num_queries
+    ) -> None:
+        """
+        A list request with the current ETag gets an empty 304 without
+        touching the DB.
+        """
+        url = reverse("post-list")
+        etag = auth_client.get(url)["ETag"]
+
+        with django_assert_num_queries(0):
+            response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+        assert not response.content
+
+    def test_list_etag_depends_on_query_params(
+        self, auth_client: APIClient, posts: List[Post]
+    ) -> None:
+        """
+        A filter or pagination mode returning the same rows has its own ETag.
+        """
+        url = reverse("post-list")
+        etag = auth_client.get(url)["ETag"]
+        etags = {etag}
+
+        for params in ({"user_id": posts[0].user_id}, {"cursor": ""}):
+            response = auth_client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200
+            assert len(response.data["results"]) == len(posts)
+            etags.add(response["ETag"])
+
+        assert len(etags) == 3
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_process_local_cache_disables_list_etag(
+        self, auth_client: APIClient, posts: List[Post]
+    ) -> None:
+        """
+        Versions of a per-process cache miss writes of other processes, so
+        lists carry no ETag while details still have their data validators.
+        """
+        list_response = auth_client.get(reverse("post-list"))
+        detail_url = reverse("post-detail", args=[posts[0].pk])
+        etag = auth_client.get(detail_url)["ETag"]
+
+        response = auth_client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        assert list_response.status_code == 200
+        assert "ETag" not in list_response
+        assert response.status_code == 304
+
+    def test_list_etag_changes_on_update_and_delete(
+        self, auth_client: APIClient, comments: List[Comment]
+    ) -> None:
+        """
+        Updating or deleting a row invalidates the list ETag.
+        """
+        url = reverse("comment-list")
+        etag = auth_client.get(url)["ETag"]
+        auth_client.patch(
+            reverse("comment-detail", args=[comments[0].id]),
+            {"body": "Edited"},
+            format="json",
+        )
+        response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+        etag = response["ETag"]
+        auth_client.delete(reverse("comment-detail", args=[comments[1].id]))
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_detail_answers_if_modified_since_with_304(
+        self, auth_client: APIClient, posts: List[Post]
+    ) -> None:
+        """
+        Detail responses carry Last-Modified and honor If-Modified-Since.
+        """
+        url = reverse("post-detail", args=[posts[0].id])
+        response = auth_client.get(url)
+        assert "Last-Modified" in response
+
+        response = auth_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+
+        assert response.status_code == 304
+
+    def test_detail_of_missing_object_is_404(self, auth_client: APIClient) -> None:
+        """
+        Conditional requests for a missing object still get a 404.
+        """
+        response = auth_client.get(
+            reverse("post-detail", args=[0]), HTTP_IF_NONE_MATCH='W/"stale"'
+        )
+
+        assert response.status_code == 404
+
+    def test_validators_are_computed_once_per_version(
+        self, auth_client: APIClient, posts: List[Post], django_assert_num_queries
+    ) -> None:
+        """
+        A conditional request after a cache miss costs one aggregate query.
+        """
+        url = reverse("post-detail", args=[posts[0].id])
+        etag = auth_client.get(url)["ETag"]
+        auth_client.get(reverse("post-list"))
+        PostSyncService()._bulk_sync([{"id": 99, "title": "New", "body": "Body"}])
+
+        with django_assert_num_queries(1):
+            response = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+
+    def test_synchronization_updates_updated_at(self, posts_payload) -> None:
+        """
+        Rows rewritten by a diff synchronization get a new updated_at.
+        """
+        service = PostSyncService()
+        service._bulk_sync(posts_payload)
+        before = Post.objects.get(external_id=1).updated_at
+
+        service._bulk_sync([{**posts_payload[0], "title": "Changed"}])
+
+        assert Post.objects.get(external_id=1).updated_at > before
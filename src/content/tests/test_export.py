@@ -0,0 +1,94 @@
+import csv
+import io
+from typing import List
+
+import orjson
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from content.models import Comment, Post
+
+
+@pytest.mark.django_db
+class TestExport:
+    """
+    Tests for the streaming export action of the content endpoints.
+    """
+
+    def test_exports_filtered_rows_as_ndjson(
+        self, auth_client: APIClient, comments: List[Comment], posts: List[Post]
+    ) -> None:
+        """
+        The export streams one JSON line per row matching the filters.
+        """
+        Comment.objects.create(post=posts[1], name="Other", email="o@x.com", body="B")
+
+        response = auth_client.get(reverse("comment-export"), {"post": posts[0].id})
+
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = b"".join(response.streaming_content).splitlines()
+        assert [orjson.loads(line)["id"] for line in lines] == [
+            comment.id for comment in comments
+        ]
+
+    def test_ndjson_rows_match_list_results(
+        self, auth_client: APIClient, posts: List[Post]
+    ) -> None:
+        """
+        Exported rows have the same representation as the list results.
+        """
+        results = auth_client.get(reverse("post-list")).json()["results"]
+
+        response = auth_client.get(reverse("post-export"))
+
+        lines = b"".join(response.streaming_content).splitlines()
+        assert [orjson.loads(line) for line in lines] == results
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_exports_csv_in_chunks(
+        self, auth_client: APIClient, posts: List[Post]
+    ) -> None:
+        """
+        The CSV export has a header and is produced one chunk at a time.
+        """
+        response = auth_client.get(reverse("post-export"), {"format": "csv"})
+
+        chunks = list(response.streaming_content)
+        assert len(chunks) == 2
+        assert response["Content-Disposition"] == 'attachment; filename="posts.csv"'
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+        assert [row["title"] for row in rows] == [post.title for post in posts]
+        assert rows[0]["updated_at"] == (
+            auth_client.get(reverse("post-detail", args=[posts[0].id])).data[
+                "updated_at"
+            ]
+        )
+
+    def test_export_requires_authentication(self, api_client: APIClient) -> None:
+        """
+        Anonymous users cannot export.
+        """
+        response = api_client.get(reverse("post-export"))
+
+        assert response.status_code == 403
+
+    def test_streams_async_iterator_under_asgi(self, user, posts: List[Post]) -> None:
+        """
+        Under ASGI the export is served from an async iterator.
+        """
+
+        async def export():
+            client = AsyncClient()
+            await client.aforce_login(user)
+            response = await client.get(reverse("post-export"))
+            assert response.is_async
+            return b"".join([chunk async for chunk in response.streaming_content])
+
+        lines = async_to_sync(export)().splitlines()
+
+        assert len(lines) == len(posts)
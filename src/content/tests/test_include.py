@@ -0,0 +1,133 @@
+from typing import List
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from content.models import Comment, Post
+from content.views import PostViewSet
+
+
+@pytest.fixture
+def posts_with_comments(db) -> List[Post]:
+    """
+    Create 10 posts with 15 comments each.
+    """
+    posts = Post.objects.bulk_create(
+        [Post(external_id=i, title=f"Post {i}", body="Body") for i in range(1, 11)]
+    )
+    Comment.objects.bulk_create(
+        [
+            Comment(
+                external_id=post.external_id * 100 + i,
+                post=post,
+                name=f"Name {i}",
+                email="user@example.com",
+                body="Body",
+            )
+            for post in posts
+            for i in range(15)
+        ]
+    )
+    return posts
+
+
+@pytest.mark.django_db
+class TestIncludeComments:
+    """
+    Tests for embedding comments in post responses with ?include=comments.
+    """
+
+    def _page_queries(self, client: APIClient, params: dict) -> List[str]:
+        """
+        Return the SQL run by a post list request.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("post-list"), params)
+        assert response.status_code == 200
+        return [query["sql"] for query in queries]
+
+    def test_list_costs_a_fixed_number_of_queries(
+        self, auth_client: APIClient, posts_with_comments: List[Post]
+    ) -> None:
+        """
+        A page of posts with comments costs a fixed number of queries,
+        whatever the number of posts on it.
+        """
+        small = self._page_queries(
+            auth_client, {"include": "comments", "external_id": 1}
+        )
+        large = self._page_queries(auth_client, {"include": "comments"})
+        cursor = self._page_queries(auth_client, {"include": "comments", "cursor": ""})
+
+        # Count estimate, exact count (small table), posts, comments.
+        assert len(small) == len(large) == 4
+        # No COUNT in cursor mode, but the last page also reads unkeyed posts.
+        assert len(cursor) == 3
+        assert not any("COUNT(" in sql for sql in cursor)
+
+    def test_comments_are_limited_per_post(
+        self, auth_client: APIClient, posts_with_comments: List[Post]
+    ) -> None:
+        """
+        Each post embeds its first comments, in external_id order.
+        """
+        response = auth_client.get(reverse("post-list"), {"include": "comments"})
+
+        for post in response.data["results"]:
+            comments = post["comments"]
+            assert len(comments) == PostViewSet.included_comments_limit
+            assert {comment["post"] for comment in comments} == {post["id"]}
+            assert [comment["external_id"] for comment in comments] == [
+                post["external_id"] * 100 + i
+                for i in range(PostViewSet.included_comments_limit)
+            ]
+
+    def test_retrieve_includes_comments(
+        self,
+        auth_client: APIClient,
+        posts_with_comments: List[Post],
+        django_assert_num_queries,
+    ) -> None:
+        """
+        The detail endpoint embeds comments with one extra query.
+        """
+        url = reverse("post-detail", args=[posts_with_comments[0].id])
+
+        # Post and comment ETag aggregates, post, comments.
+        with django_assert_num_queries(4):
+            response = auth_client.get(url, {"include": "comments"})
+
+        assert len(response.data["comments"]) == PostViewSet.included_comments_limit
+        assert "comments" not in auth_client.get(url).data
+
+    def test_comment_changes_refresh_embedded_comments(
+        self, auth_client: APIClient, posts_with_comments: List[Post]
+    ) -> None:
+        """
+        Cached responses and ETags with embedded comments follow comment
+        writes.
+        """
+        post = posts_with_comments[0]
+        url = reverse("post-detail", args=[post.id])
+        list_etag = auth_client.get(reverse("post-list"), {"include": "comments"})[
+            "ETag"
+        ]
+        response = auth_client.get(url, {"include": "comments"})
+        etag = response["ETag"]
+        assert "Last-Modified" not in response
+        comment_id = response.data["comments"][0]["id"]
+
+        auth_client.delete(reverse("comment-detail", args=[comment_id]))
+
+        response = auth_client.get(
+            url, {"include": "comments"}, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 200
+        assert comment_id not in [c["id"] for c in response.data["comments"]]
+        response = auth_client.get(
+            reverse("post-list"), {"include": "comments"}, HTTP_IF_NONE_MATCH=list_etag
+        )
+        assert response.status_code == 200
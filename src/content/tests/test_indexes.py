@@ -0,0 +1,99 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from content.models import Comment, Post
+
+
+@pytest.fixture
+def indexed_content(db) -> list[Post]:
+    """
+    Create posts and comments, refresh the planner statistics and disable
+    sequential scans so the plans reflect the available indexes.
+    """
+    posts = Post.objects.bulk_create(
+        [
+            Post(external_id=i, user_id=i % 100, title=f"Post {i}", body="Body")
+            for i in range(1, 2001)
+        ]
+    )
+    Comment.objects.bulk_create(
+        [
+            Comment(
+                external_id=i,
+                post=posts[i % 200],
+                name=f"Commenter {i}",
+                email=f"user{i}@example.com",
+                body="Body",
+            )
+            for i in range(1, 1001)
+        ]
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE content_post")
+        cursor.execute("ANALYZE content_comment")
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    return posts
+
+
+def explain(sql: str, params=None) -> str:
+    """
+    Return the query plan of an SQL statement as text.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN {sql}", params)
+        return "\n".join(row[0] for row in cursor.fetchall())
+
+
+def list_queries(client: APIClient, url_name: str, params: dict) -> list[str]:
+    """
+    Return the SQL run by a list request.
+    """
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse(url_name), params)
+    assert response.status_code == 200
+    return [query["sql"] for query in queries]
+
+
+@pytest.mark.django_db
+class TestQueryIndexes:
+    """
+    Tests asserting the hot list queries are served by index scans.
+    """
+
+    def test_posts_by_user(self, auth_client: APIClient, indexed_content) -> None:
+        """
+        ?user_id= ordered by external_id uses the (user_id, external_id) index.
+        """
+        sql = list_queries(auth_client, "post-list", {"user_id": 3})[-1]
+        assert "content_post_user_ext_idx" in explain(sql)
+
+    def test_comments_of_post_by_cursor(
+        self, auth_client: APIClient, indexed_content
+    ) -> None:
+        """
+        Cursor pages of ?post= use the partial (post_id, external_id) index.
+        """
+        post = indexed_content[5]
+        queries = list_queries(
+            auth_client, "comment-list", {"post": post.id, "cursor": ""}
+        )
+        keyed_sql = next(sql for sql in queries if "IS NOT NULL" in sql)
+        assert "content_comment_post_ext_idx" in explain(keyed_sql)
+
+    def test_unkeyed_posts_by_cursor(self, indexed_content) -> None:
+        """
+        Keyset pages over posts without an external_id use the partial index.
+        """
+        queryset = Post.objects.filter(external_id__isnull=True, id__gt=1)
+        sql, params = queryset.order_by("id")[:10].query.sql_with_params()
+        assert "content_post_unkeyed_idx" in explain(sql, params)
+
+    def test_default_ordering(self, indexed_content) -> None:
+        """
+        The default -created_at ordering uses the created_at index.
+        """
+        sql, params = Comment.objects.all()[:10].query.sql_with_params()
+        assert "content_comment_created_idx" in explain(sql, params)
@@ -0,0 +1,154 @@
+import subprocess
+import sys
+from typing import List
+
+import pytest
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from rest_framework.test import APIClient
+
+from common.metrics import metrics_registry
+from content.models import Post
+
+# Observes one request in a separate process writing to PROMETHEUS_MULTIPROC_DIR,
+# like a gunicorn worker does.
+WORKER_SCRIPT = """
+from prometheus_client import Histogram
+histogram = Histogram("worker_request_seconds", "Test", ["view"])
+histogram.labels("PostViewSet").observe(0.2)
+"""
+
+
+def _sample(name: str, **labels: str) -> float:
+    """
+    Return the current value of a sample of the default registry.
+    """
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    """
+    Tests for the Prometheus metrics endpoint and instrumentation.
+    """
+
+    def test_requests_are_observed_by_action(
+        self, auth_client: APIClient, posts: List[Post]
+    ) -> None:
+        """
+        Requests are observed by viewset action, with their queries.
+        """
+        labels = {"view": "PostViewSet", "action": "list"}
+        before = _sample(
+            "http_request_duration_seconds_count", method="GET", status="200", **labels
+        )
+        queries = _sample("http_request_db_queries_sum", **labels)
+
+        response = auth_client.get(reverse("post-list"))
+
+        after = _sample(
+            "http_request_duration_seconds_count", method="GET", status="200", **labels
+        )
+        assert after == before + 1
+        # Sampled requests reuse the query count of their profile.
+        profiled = int(response["Server-Timing"].split('desc="')[1].split(" ")[0])
+        assert _sample("http_request_db_queries_sum", **labels) == queries + profiled
+        assert profiled > 0
+
+    def test_cache_hits_and_misses_are_counted(
+        self, auth_client: APIClient, posts: List[Post]
+    ) -> None:
+        """
+        Cached responses count as hits and the first lookup as a miss.
+        """
+        hits = _sample("cache_requests_total", cache="api_response", result="hit")
+        misses = _sample("cache_requests_total", cache="api_response", result="miss")
+
+        auth_client.get(reverse("post-list"))
+        auth_client.get(reverse("post-list"))
+
+        assert (
+            _sample("cache_requests_total", cache="api_response", result="hit")
+            == hits + 1
+        )
+        assert (
+            _sample("cache_requests_total", cache="api_response", result="miss")
+            == misses + 1
+        )
+
+    @override_settings(REQUEST_PROFILING_SAMPLE_RATE=0)
+    def test_unsampled_requests_count_queries(
+        self, auth_client: APIClient, posts: List[Post]
+    ) -> None:
+        """
+        Requests left out of the profiling sample still count their queries.
+        """
+        labels = {"view": "PostViewSet", "action": "list"}
+        queries = _sample("http_request_db_queries_sum", **labels)
+
+        auth_client.get(reverse("post-list"))
+
+        assert _sample("http_request_db_queries_sum", **labels) > queries
+
+    def test_metrics_endpoint(
+        self, api_client: APIClient, user: User, posts: List[Post]
+    ) -> None:
+        """
+        The endpoint exposes the request, cache and sync run metrics to staff.
+        """
+        api_client.get(reverse("post-list"))
+        user.is_staff = True
+        user.save()
+        api_client.force_login(user)
+
+        response = api_client.get(reverse("metrics"))
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == CONTENT_TYPE_LATEST
+        body = response.content.decode()
+        assert "# TYPE http_request_duration_seconds histogram" in body
+        assert "# TYPE http_request_db_duration_seconds histogram" in body
+        assert "# TYPE cache_requests_total counter" in body
+        assert "# TYPE sync_runs gauge" in body
+
+    def test_metrics_are_closed_by_default(
+        self, api_client: APIClient, user: User
+    ) -> None:
+        """
+        Without a token, anonymous and non-staff requests are rejected.
+        """
+        anonymous = api_client.get(reverse("metrics"))
+        api_client.force_login(user)
+        non_staff = api_client.get(reverse("metrics"))
+
+        assert anonymous.status_code == non_staff.status_code == 401
+
+    @override_settings(METRICS_AUTH_TOKEN="scrape-token")
+    def test_metrics_token(self, api_client: APIClient) -> None:
+        """
+        With a configured token, scrapes must send it as a bearer token.
+        """
+        missing = api_client.get(reverse("metrics"))
+        api_client.credentials(HTTP_AUTHORIZATION="Bearer wrong-token")
+        wrong = api_client.get(reverse("metrics"))
+        api_client.credentials(HTTP_AUTHORIZATION="Bearer scrape-token")
+        valid = api_client.get(reverse("metrics"))
+
+        assert missing.status_code == wrong.status_code == 401
+        assert valid.status_code == 200
+
+    def test_worker_processes_are_aggregated(self, tmp_path, monkeypatch) -> None:
+        """
+        In multiprocess mode, the samples of every worker are summed.
+        """
+        env = {"PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+        for _ in range(3):
+            subprocess.run([sys.executable, "-c", WORKER_SCRIPT], env=env, check=True)
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+        lines = generate_latest(metrics_registry()).decode().splitlines()
+
+        assert 'worker_request_seconds_count{view="PostViewSet"} 3.0' in lines
+        assert "# TYPE sync_runs gauge" in lines
@@ -0,0 +1,241 @@
+import base64
+import json
+from unittest.mock import patch
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from common.pagination import KeysetPagination
+from content.models import Post
+
+
+@pytest.fixture
+def many_posts(db) -> list[Post]:
+    """
+    Create 25 posts with an external_id and 5 posts created through the API.
+    """
+    Post.objects.bulk_create(
+        [Post(external_id=i, title=f"Post {i}", body="Body") for i in range(1, 26)]
+        + [Post(title=f"Local {i}", body="Body") for i in range(5)]
+    )
+    return list(Post.objects.order_by("external_id", "id"))
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """
+    Tests for the cursor mode of the content list endpoints.
+    """
+
+    def test_walks_all_pages_forward_and_back(
+        self, auth_client: APIClient, many_posts: list[Post]
+    ) -> None:
+        """
+        Following next and previous links visits every post exactly once.
+        """
+        url = reverse("post-list") + "?cursor="
+        pages = []
+        while url:
+            response = auth_client.get(url)
+            assert response.status_code == 200
+            assert "count" not in response.data
+            pages.append([post["id"] for post in response.data["results"]])
+            url = response.data["next"]
+
+        assert [len(page) for page in pages] == [10, 10, 10]
+        assert sum(pages, []) == [post.id for post in many_posts]
+
+        url = response.data["previous"]
+        previous_pages = []
+        while url:
+            response = auth_client.get(url)
+            previous_pages.insert(0, [post["id"] for post in response.data["results"]])
+            url = response.data["previous"]
+        assert previous_pages == pages[:-1]
+
+    def test_supports_filters(
+        self, auth_client: APIClient, many_posts: list[Post]
+    ) -> None:
+        """
+        The filterset filters still apply in cursor mode.
+        """
+        response = auth_client.get(
+            reverse("post-list"), {"cursor": "", "external_id": 3}
+        )
+        assert [post["external_id"] for post in response.data["results"]] == [3]
+        assert response.data["next"] is None
+
+    def test_invalid_cursor(self, auth_client: APIClient) -> None:
+        """
+        A malformed cursor returns 404.
+        """
+        response = auth_client.get(reverse("post-list"), {"cursor": "not-a-cursor"})
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            ["abc", 5, False],
+            [{"a": 1}, "x", False],
+            [3, "5", False],
+            [3, 5, "yes"],
+            [3, 5],
+        ],
+    )
+    def test_forged_cursor(self, auth_client: APIClient, payload: list) -> None:
+        """
+        A well-encoded cursor with values of the wrong type returns 404.
+        """
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        response = auth_client.get(reverse("post-list"), {"cursor": cursor})
+
+        assert response.status_code == 404
+
+    def test_page_number_mode_is_kept(
+        self, auth_client: APIClient, many_posts: list[Post]
+    ) -> None:
+        """
+        Without a cursor the page number response format is unchanged.
+        """
+        response = auth_client.get(reverse("post-list"), {"page": 2})
+        assert response.data["count"] == len(many_posts)
+
+
+@pytest.mark.django_db
+def test_deep_pages_cost_the_same_as_the_first(auth_client: APIClient) -> None:
+    """
+    Benchmark the query shape: a deep cursor page runs the same single
+    LIMIT query as the first page, without COUNT or OFFSET, on an index.
+    """
+    Post.objects.bulk_create(
+        [Post(external_id=i, title=f"Post {i}", body="Body") for i in range(1, 5001)]
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE content_post")
+    deep_post = Post.objects.get(external_id=4900)
+    deep_cursor = KeysetPagination().encode_cursor((4900, deep_post.pk), False)
+
+    captured = {}
+    for name, cursor in (("first", ""), ("deep", deep_cursor)):
+        with CaptureQueriesContext(connection) as queries:
+            response = auth_client.get(reverse("post-list"), {"cursor": cursor})
+        assert response.status_code == 200
+        captured[name] = [query["sql"] for query in queries]
+
+    assert len(captured["first"]) == len(captured["deep"]) == 1
+    deep_sql = captured["deep"][0]
+    assert "COUNT(" not in deep_sql and "OFFSET" not in deep_sql
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN {deep_sql}")
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+    assert "Index Scan" in plan
+
+
+@pytest.mark.django_db
+class TestApproximateCountPagination:
+    """
+    Tests for the estimated counts of page number pagination.
+    """
+
+    def _get(self, client: APIClient, params: dict) -> tuple[dict, list[str]]:
+        """
+        Return the data of a post list request and its SQL queries.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("post-list"), params)
+        assert response.status_code == 200
+        return response.data, [query["sql"] for query in queries]
+
+    def test_small_result_sets_are_counted_exactly(
+        self, auth_client: APIClient, many_posts: list[Post]
+    ) -> None:
+        """
+        Below the threshold the count is exact and flagged as such.
+        """
+        data, _ = self._get(auth_client, {})
+
+        assert data["count"] == len(many_posts)
+        assert data["count_is_approximate"] is False
+
+    def test_unfiltered_count_uses_table_statistics(
+        self, auth_client: APIClient, many_posts: list[Post], settings
+    ) -> None:
+        """
+        Above the threshold an unfiltered list reads pg_class, not COUNT(*).
+        """
+        settings.APPROXIMATE_COUNT_THRESHOLD = 10
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE content_post")
+
+        data, queries = self._get(auth_client, {})
+
+        assert data["count"] == len(many_posts)
+        assert data["count_is_approximate"] is True
+        assert any("reltuples" in sql for sql in queries)
+        assert not any("COUNT(" in sql for sql in queries)
+
+    def test_filtered_count_uses_plan_estimate(
+        self, auth_client: APIClient, many_posts: list[Post], settings
+    ) -> None:
+        """
+        Above the threshold a filtered list uses the planner's row estimate.
+        """
+        settings.APPROXIMATE_COUNT_THRESHOLD = 10
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE content_post")
+
+        data, queries = self._get(auth_client, {"user_id": many_posts[0].user_id})
+
+        assert data["count_is_approximate"] is True
+        assert data["count"] > 0
+        assert any(sql.startswith("EXPLAIN") for sql in queries)
+        assert not any("COUNT(" in sql for sql in queries)
+
+    def test_small_filtered_result_is_counted_exactly(
+        self, auth_client: APIClient, many_posts: list[Post], settings
+    ) -> None:
+        """
+        A filtered list estimated below the threshold falls back to COUNT(*).
+        """
+        settings.APPROXIMATE_COUNT_THRESHOLD = 10
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE content_post")
+
+        data, queries = self._get(auth_client, {"external_id": 1})
+
+        assert data["count"] == 1
+        assert data["count_is_approximate"] is False
+        assert any("COUNT(*)" in sql for sql in queries)
+
+    def test_low_estimate_does_not_cut_pages(
+        self, auth_client: APIClient, settings
+    ) -> None:
+        """
+        An estimate below the real count neither hides rows nor ends the
+        pages early.
+        """
+        settings.APPROXIMATE_COUNT_THRESHOLD = 10
+        Post.objects.bulk_create(
+            [Post(external_id=i, title=f"Post {i}", body="Body") for i in range(105)]
+        )
+
+        with patch("common.pagination.estimate_count", return_value=95):
+            page_10, _ = self._get(auth_client, {"page": 10})
+            page_11, _ = self._get(auth_client, {"page": 11})
+            page_12, _ = self._get(auth_client, {"page": 12})
+
+        assert page_10["count"] == 95
+        assert [post["external_id"] for post in page_10["results"]] == list(
+            range(90, 100)
+        )
+        assert page_10["next"] is not None
+        assert [post["external_id"] for post in page_11["results"]] == list(
+            range(100, 105)
+        )
+        assert page_11["next"] is None
+        assert page_11["previous"] is not None
+        assert page_12["results"] == []
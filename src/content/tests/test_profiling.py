@@ -0,0 +1,110 @@
+import json
+import logging
+from typing import List
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from common.middleware import DuplicateQueriesError, RequestProfilingMiddleware
+from content.models import Post
+
+
+def _n_plus_one(request) -> HttpResponse:
+    """
+    View running one query per post, like a missing select_related.
+    """
+    for pk in range(12):
+        Post.objects.filter(pk=pk).exists()
+    return HttpResponse("ok")
+
+
+@pytest.mark.django_db
+class TestRequestProfilingMiddleware:
+    """
+    Tests for the per-request query and timing instrumentation.
+    """
+
+    def test_server_timing_header(
+        self, auth_client: APIClient, posts: List[Post]
+    ) -> None:
+        """
+        Sampled responses report SQL, auth, view, render and total timings.
+        """
+        response = auth_client.get(reverse("post-list"))
+
+        metrics = [
+            metric.split(";")[0] for metric in response["Server-Timing"].split(", ")
+        ]
+        assert metrics == ["db", "auth", "view", "render", "total"]
+        assert 'desc="' in response["Server-Timing"]
+
+    @override_settings(REQUEST_PROFILING_SERVER_TIMING=False)
+    def test_server_timing_header_can_be_disabled(
+        self, auth_client: APIClient, posts: List[Post]
+    ) -> None:
+        """
+        Without REQUEST_PROFILING_SERVER_TIMING, timings stay server-side.
+        """
+        response = auth_client.get(reverse("post-list"))
+
+        assert response.status_code == 200
+        assert "Server-Timing" not in response
+
+    @override_settings(REQUEST_PROFILING_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_measured(
+        self, auth_client: APIClient, posts: List[Post]
+    ) -> None:
+        """
+        Requests left out of the sample carry no Server-Timing header.
+        """
+        response = auth_client.get(reverse("post-list"))
+
+        assert response.status_code == 200
+        assert "Server-Timing" not in response
+
+    @override_settings(REQUEST_PROFILING_SLOW_MS=0)
+    def test_slow_requests_are_logged(
+        self, auth_client: APIClient, posts: List[Post], caplog
+    ) -> None:
+        """
+        Requests above the time threshold are logged as a JSON record.
+        """
+        with caplog.at_level(logging.WARNING, logger="common.middleware"):
+            auth_client.get(reverse("post-list"))
+
+        [record] = caplog.records
+        profile = json.loads(record.getMessage().split(" ", 1)[1])
+        assert profile == record.profile
+        assert profile["path"] == reverse("post-list")
+        assert profile["status"] == 200
+        assert profile["slow"] is True
+        assert profile["queries"] >= 1
+        assert "repeated_query" not in profile
+
+    def test_repeated_queries_raise(self) -> None:
+        """
+        In test mode, a request repeating a statement fails loudly.
+        """
+        middleware = RequestProfilingMiddleware(_n_plus_one)
+
+        with pytest.raises(DuplicateQueriesError, match="same query 12 times"):
+            middleware(RequestFactory().get("/"))
+
+    @override_settings(REQUEST_PROFILING_RAISE_ON_DUPLICATES=False)
+    def test_repeated_queries_are_logged(self, caplog) -> None:
+        """
+        Outside of test mode, repeated statements are logged instead.
+        """
+        middleware = RequestProfilingMiddleware(_n_plus_one)
+
+        with caplog.at_level(logging.WARNING, logger="common.middleware"):
+            response = middleware(RequestFactory().get("/"))
+
+        assert response.status_code == 200
+        [record] = caplog.records
+        assert record.profile["repeated_query"]["count"] == 12
+        assert record.profile["queries"] == 12
+        assert record.profile["too_many_queries"] is False
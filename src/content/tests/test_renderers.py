@@ -0,0 +1,73 @@
+from io import StringIO
+from typing import List
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from common.renderers import ORJSONRenderer
+from content.models import Comment, Post
+from content.serializers import CommentSerializer, PostSerializer
+
+
+@pytest.mark.django_db
+class TestValuesListPath:
+    """
+    Tests for the `.values()` list path and the orjson renderer.
+    """
+
+    def test_list_output_matches_serializer_output(
+        self, auth_client: APIClient, comments: List[Comment]
+    ) -> None:
+        """
+        List responses are byte-identical to serializing model instances.
+        """
+        Post.objects.create(title="Ünïcode \u2028 line", body="Body")
+        for url_name, serializer_class, model in (
+            ("post-list", PostSerializer, Post),
+            ("comment-list", CommentSerializer, Comment),
+        ):
+            response = auth_client.get(reverse(url_name))
+            assert response.data["next"] is None
+            expected = serializer_class(
+                model.objects.order_by("external_id"), many=True
+            ).data
+
+            results = response.content.split(b'"results":', 1)[1][:-1]
+            assert results == JSONRenderer().render(expected)
+
+    def test_list_does_not_build_serializers(
+        self, auth_client: APIClient, posts: List[Post], monkeypatch
+    ) -> None:
+        """
+        The list action never instantiates the serializer.
+        """
+        monkeypatch.setattr(PostSerializer, "to_representation", None)
+
+        response = auth_client.get(reverse("post-list"))
+
+        assert response.status_code == 200
+        assert len(response.data["results"]) == len(posts)
+
+    def test_renderer_falls_back_for_indented_output(self) -> None:
+        """
+        Indented output is left to the standard JSON renderer.
+        """
+        data = {"a": [1, 2]}
+
+        rendered = ORJSONRenderer().render(data, "application/json; indent=2", {})
+
+        assert rendered == JSONRenderer().render(data, "application/json; indent=2")
+
+    def test_benchmark_command(self) -> None:
+        """
+        The benchmark checks both paths produce the same output.
+        """
+        out = StringIO()
+        call_command("bench_list_serialization", "--rows", "200", stdout=out)
+
+        output = out.getvalue()
+        assert "posts: serializer" in output and "comments: serializer" in output
+        assert not Post.objects.exists()
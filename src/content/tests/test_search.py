@@ -0,0 +1,130 @@
+from typing import List
+from unittest.mock import patch
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from common.synchronizers import WRITE_STRATEGY_DIFF, WRITE_STRATEGY_UPSERT
+from content.models import Comment, Post
+from content.utils.synchronizers import PostSyncService
+
+
+@pytest.fixture
+def searchable_posts(db) -> List[Post]:
+    """
+    Create posts whose title or body mention running.
+    """
+    return [
+        Post.objects.create(external_id=1, title="Gardening", body="Roses"),
+        Post.objects.create(external_id=2, title="Weekly notes", body="I ran and ran"),
+        Post.objects.create(external_id=3, title="Running shoes", body="A review"),
+        Post.objects.create(external_id=4, title="Cooking", body="Runs of pasta"),
+    ]
+
+
+def search_ids(client: APIClient, url_name: str, term: str) -> List[int]:
+    """
+    Return the ids of the list results matching a search term, in order.
+    """
+    response = client.get(reverse(url_name), {"search": term})
+    assert response.status_code == 200
+    return [row["id"] for row in response.data["results"]]
+
+
+@pytest.mark.django_db
+class TestFullTextSearch:
+    """
+    Tests for ?search= on the content list endpoints.
+    """
+
+    def test_matches_stemmed_words_ranked_by_field(
+        self, auth_client: APIClient, searchable_posts: List[Post]
+    ) -> None:
+        """
+        Title matches rank above body matches; stemming matches word forms.
+        """
+        ids = search_ids(auth_client, "post-list", "running")
+
+        assert ids == [searchable_posts[2].id, searchable_posts[3].id]
+
+    def test_supports_web_search_syntax(
+        self, auth_client: APIClient, searchable_posts: List[Post]
+    ) -> None:
+        """
+        Queries accept `or` and negated words.
+        """
+        ids = search_ids(auth_client, "post-list", "roses or shoes")
+        assert set(ids) == {searchable_posts[0].id, searchable_posts[2].id}
+
+        ids = search_ids(auth_client, "post-list", "running -review")
+        assert ids == [searchable_posts[3].id]
+
+    def test_searches_comment_name_and_body(
+        self, auth_client: APIClient, comments: List[Comment]
+    ) -> None:
+        """
+        Comments are searchable by commenter name and body.
+        """
+        Comment.objects.filter(pk=comments[1].pk).update(body="Great article")
+
+        assert search_ids(auth_client, "comment-list", "articles") == [comments[1].id]
+        assert set(search_ids(auth_client, "comment-list", "commenter")) == {
+            comment.id for comment in comments
+        }
+
+    def test_search_uses_gin_index(
+        self, auth_client: APIClient, searchable_posts: List[Post]
+    ) -> None:
+        """
+        On a large table the search condition is served by the GIN index.
+        """
+        Post.objects.bulk_create(
+            [
+                Post(external_id=i, title=f"Post {i}", body="Lorem ipsum")
+                for i in range(100, 2100)
+            ]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE content_post")
+        with CaptureQueriesContext(connection) as queries:
+            auth_client.get(reverse("post-list"), {"search": "running"})
+        sql = next(q["sql"] for q in queries if "LIMIT" in q["sql"])
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"EXPLAIN {sql}")
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        assert "content_post_search_idx" in plan
+
+    @pytest.mark.parametrize(
+        "write_strategy", [WRITE_STRATEGY_DIFF, WRITE_STRATEGY_UPSERT]
+    )
+    def test_synchronized_rows_are_searchable(
+        self, auth_client: APIClient, user, write_strategy: str
+    ) -> None:
+        """
+        Rows written and rewritten by the sync bulk paths are searchable.
+        """
+        service = PostSyncService(write_strategy=write_strategy)
+        service._bulk_sync([{"id": 1, "title": "Jogging", "body": "Body"}])
+        assert search_ids(auth_client, "post-list", "jogging")
+
+        service._bulk_sync([{"id": 1, "title": "Swimming", "body": "Body"}])
+
+        assert not search_ids(auth_client, "post-list", "jogging")
+        assert search_ids(auth_client, "post-list", "swimming")
+
+    def test_bulk_loaded_rows_are_searchable(self, auth_client: APIClient) -> None:
+        """
+        Rows copied by bulk_load are searchable.
+        """
+        service = PostSyncService()
+        payload = [{"id": 1, "title": "Cycling", "body": "Body"}]
+
+        with patch.object(service.handler_class, "list_items", return_value=payload):
+            service.bulk_load()
+
+        assert search_ids(auth_client, "post-list", "cycling")
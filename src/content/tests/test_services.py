@@ -1,7 +1,12 @@
+from types import GeneratorType
 from unittest.mock import MagicMock, patch
 
+import pytest
 import requests
 
+from common.services import FakeApiRequestsHandler
+from common.testing import StubApiServer
+
 
 class TestFakeApiRequestsHandler:
     """
@@ -49,3 +54,87 @@ class TestFakeApiRequestsHandler:
                 "API request to https://jsonplaceholder.typicode.com failed"
                 in caplog.text
             )
+
+
+class TestPaginatedFetching:
+    """
+    Tests for paged and concurrent fetching against a local stub server.
+    """
+
+    def test_list_pages_returns_all_items(self):
+        """
+        _list_from_endpoint should join every page in order.
+        """
+        items = [{"id": i} for i in range(1, 26)]
+        with StubApiServer({"posts": items}) as server:
+            handler = FakeApiRequestsHandler(server.url, page_size=10)
+            assert handler._list_from_endpoint("posts") == items
+
+    def test_list_pages_without_total_count(self):
+        """
+        Pages should be fetched until a short page without X-Total-Count.
+        """
+        items = [{"id": i} for i in range(1, 26)]
+        handler = FakeApiRequestsHandler(page_size=10)
+        pages = [items[0:10], items[10:20], items[20:25]]
+        responses = [
+            MagicMock(headers={}, json=MagicMock(return_value=p)) for p in pages
+        ]
+
+        with patch.object(handler, "_fetch_request_data", side_effect=responses):
+            assert handler._list_from_endpoint("posts") == items
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_pages_are_fetched_concurrently(self, workers):
+        """
+        Up to `max_workers` page requests should be in flight at once.
+        """
+        items = [{"id": i} for i in range(1, 81)]
+        with StubApiServer({"comments": items}, delay=0.05) as server:
+            handler = FakeApiRequestsHandler(
+                server.url, page_size=10, max_workers=workers
+            )
+            assert handler._list_from_endpoint("comments") == items
+            windows = server.windows
+
+        in_flight = max(
+            sum(start <= started < end for _, start, end in windows)
+            for _, started, _ in windows
+        )
+        assert in_flight <= workers
+        assert (in_flight > 1) == (workers > 1)
+
+
+class TestStreamedFetching:
+    """
+    Tests for incremental parsing of streamed responses.
+    """
+
+    def test_stream_yields_items_lazily(self):
+        """
+        _list_from_endpoint should return a generator over every item.
+        """
+        items = [{"id": i, "title": f"Post {i}", "score": i / 2} for i in range(1, 501)]
+        with StubApiServer({"posts": items}) as server:
+            handler = FakeApiRequestsHandler(server.url, stream=True)
+            handler.stream_chunk_size = 256
+            streamed = handler._list_from_endpoint("posts")
+            assert isinstance(streamed, GeneratorType)
+            assert list(streamed) == items
+
+    def test_stream_and_page_size_are_exclusive(self):
+        """
+        Streaming cannot be combined with paged fetching.
+        """
+        with pytest.raises(ValueError, match="cannot be combined"):
+            FakeApiRequestsHandler(stream=True, page_size=10)
+
+    def test_stream_failure_yields_nothing(self, handler, caplog):
+        """
+        A failed streamed request should log a warning and yield no items.
+        """
+        handler.stream = True
+        with patch.object(handler, "_fetch_request_data", return_value=None):
+            with caplog.at_level("WARNING"):
+                assert list(handler._list_from_endpoint("posts")) == []
+        assert "No data retrieved" in caplog.text
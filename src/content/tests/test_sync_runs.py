@@ -0,0 +1,195 @@
+import json
+from datetime import timedelta
+from typing import List
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from common.models import SyncRun
+from common.testing import StubApiServer
+from content.models import Post
+from content.utils.synchronizers import CommentSyncService, PostSyncService
+
+
+@pytest.mark.django_db
+class TestSyncRunRecording:
+    """
+    Tests for the SyncRun records of the synchronization services.
+    """
+
+    def test_successful_run_is_recorded(self, posts_payload: List[dict]) -> None:
+        """
+        A run records its counts, phases, downloaded bytes and queries.
+        """
+        with StubApiServer({"posts": posts_payload}) as server:
+            PostSyncService(handler_options={"endpoint": server.url}).synchronize()
+
+        run = SyncRun.objects.get()
+        assert run.resource == "content.post"
+        assert run.method == "synchronize"
+        assert run.outcome == SyncRun.Outcome.SUCCESS
+        assert (run.fetched_count, run.inserted_count, run.updated_count) == (2, 2, 0)
+        assert run.downloaded_bytes == len(json.dumps(posts_payload).encode())
+        assert run.query_count > 0
+        assert run.fetch_seconds > 0
+        assert run.diff_seconds > 0
+        assert run.write_seconds > 0
+        assert run.duration_seconds >= run.fetch_seconds + run.diff_seconds
+        assert run.finished_at >= run.started_at
+
+    def test_unchanged_run_is_recorded_as_not_modified(
+        self, posts_payload: List[dict]
+    ) -> None:
+        """
+        A run skipped by a conditional request is recorded as not modified.
+        """
+        with StubApiServer({"posts": posts_payload}) as server:
+            service = PostSyncService(
+                handler_options={"endpoint": server.url, "conditional": True}
+            )
+            service.synchronize()
+            service.synchronize()
+
+        latest = SyncRun.objects.first()
+        assert latest.outcome == SyncRun.Outcome.NOT_MODIFIED
+        assert (latest.inserted_count, latest.updated_count) == (0, 0)
+
+    def test_failed_run_is_recorded(self, posts_payload: List[dict]) -> None:
+        """
+        A failing run is recorded with its error before it propagates.
+        """
+        service = PostSyncService()
+
+        with patch.object(service.handler_class, "list_items", return_value=[]):
+            with patch.object(service, "_bulk_sync", side_effect=ValueError("boom")):
+                with pytest.raises(ValueError):
+                    service.synchronize()
+
+        run = SyncRun.objects.get()
+        assert run.outcome == SyncRun.Outcome.FAILED
+        assert "boom" in run.error
+
+    def test_bulk_load_and_pages_are_recorded(
+        self, posts: List[Post], posts_payload: List[dict]
+    ) -> None:
+        """
+        COPY loads and chunk pages are recorded with their own method.
+        """
+        with StubApiServer({"posts": posts_payload}) as server:
+            options = {"endpoint": server.url, "page_size": 1}
+            PostSyncService(handler_options=options).bulk_load()
+            PostSyncService(handler_options=options).synchronize_page(1)
+
+        assert sorted(SyncRun.objects.values_list("method", flat=True)) == [
+            "bulk_load",
+            "page",
+        ]
+        assert not SyncRun.objects.exclude(outcome=SyncRun.Outcome.SUCCESS).exists()
+
+    @override_settings(SYNC_RUN_RETENTION_DAYS=7)
+    def test_runs_past_retention_are_deleted(self, posts_payload: List[dict]) -> None:
+        """
+        Recording a run deletes the runs older than the retention period.
+        """
+        service = PostSyncService()
+        with patch.object(service.handler_class, "list_items", return_value=[]):
+            service.synchronize()
+            SyncRun.objects.update(started_at=timezone.now() - timedelta(days=8))
+            service.synchronize()
+
+        assert SyncRun.objects.count() == 1
+
+
+@pytest.mark.django_db
+class TestSyncRunApi:
+    """
+    Tests for the sync run history endpoints.
+    """
+
+    @pytest.fixture
+    def runs(self, posts: List[Post], comments_payload: List[dict]) -> None:
+        """
+        Record a failed and a successful comment run.
+        """
+        service = CommentSyncService()
+        with patch.object(
+            service.handler_class, "list_items", side_effect=RuntimeError("down")
+        ):
+            with pytest.raises(RuntimeError):
+                service.synchronize()
+        with patch.object(
+            service.handler_class, "list_items", return_value=comments_payload
+        ):
+            service.synchronize()
+
+    def test_requires_authentication(self, api_client: APIClient) -> None:
+        """
+        The history is not public.
+        """
+        response = api_client.get(reverse("syncrun-list"))
+
+        assert response.status_code == 403
+
+    def test_list_runs_latest_first(self, auth_client: APIClient, runs) -> None:
+        """
+        Runs are listed latest first and can be filtered by outcome.
+        """
+        response = auth_client.get(reverse("syncrun-list"))
+        failed = auth_client.get(reverse("syncrun-list"), {"outcome": "failed"})
+
+        assert [run["outcome"] for run in response.data["results"]] == [
+            "success",
+            "failed",
+        ]
+        assert [run["error"] for run in failed.data["results"]] == [
+            "RuntimeError('down')"
+        ]
+
+    def test_runs_are_read_only(self, auth_client: APIClient, runs) -> None:
+        """
+        Runs cannot be created or deleted through the API.
+        """
+        run = SyncRun.objects.first()
+
+        assert auth_client.post(reverse("syncrun-list"), {}).status_code == 405
+        detail = reverse("syncrun-detail", args=[run.pk])
+        assert auth_client.delete(detail).status_code == 405
+
+    def test_prometheus_metrics(self, api_client: APIClient, user: User, runs) -> None:
+        """
+        /metrics/ exposes the run counts and the latest run of each resource.
+        """
+        user.is_staff = True
+        user.save()
+        api_client.force_login(user)
+
+        response = api_client.get(reverse("metrics"))
+
+        assert response.status_code == 200
+        lines = response.content.decode().splitlines()
+        # Label names are sorted in the exposition.
+        resource = 'resource="content.comment"'
+        labels = f'method="synchronize",{resource}'
+        assert "# TYPE sync_runs gauge" in lines
+        assert (
+            f'sync_runs{{method="synchronize",outcome="failed",{resource}}} 1.0'
+            in lines
+        )
+        assert (
+            f'sync_runs{{method="synchronize",outcome="success",{resource}}} 1.0'
+            in lines
+        )
+        assert f"sync_last_run_success{{{labels}}} 1.0" in lines
+        assert f'sync_last_run_items{{kind="inserted",{labels}}} 2.0' in lines
+        assert any(
+            line.startswith(
+                f'sync_last_run_duration_seconds{{method="synchronize",'
+                f'phase="write",{resource}}}'
+            )
+            for line in lines
+        )
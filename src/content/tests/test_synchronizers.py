@@ -1,7 +1,12 @@
-from unittest.mock import patch
+from importlib import import_module
+from unittest.mock import MagicMock, patch
 
 import pytest
+from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
+from common.testing import StubApiServer
 from content.models import Comment, Post
 from content.utils.synchronizers import CommentSyncService, PostSyncService
 
@@ -54,3 +59,300 @@ class TestSyncServices:
             post_id = comments_payload[i].get("postId")
             if post_id:
                 assert comment.post.external_id == post_id
+
+    @pytest.mark.parametrize("comment_count", [2, 50])
+    def test_synchronize_comments_constant_queries(
+        self, posts, django_assert_num_queries, comment_count
+    ) -> None:
+        """
+        Test that CommentSyncService resolves posts without per-comment queries.
+        """
+        payload = [
+            {
+                "postId": posts[i % len(posts)].external_id,
+                "id": i + 1,
+                "name": f"Commenter {i}",
+                "email": f"user{i}@example.com",
+                "body": "Comment body",
+            }
+            for i in range(comment_count)
+        ]
+        service = CommentSyncService()
+
+        with patch.object(service.handler_class, "list_items", return_value=payload):
+            # Including the pruning of old SyncRun records and the insert.
+            with django_assert_num_queries(7):
+                service.synchronize()
+
+        assert Comment.objects.count() == comment_count
+        assert not Comment.objects.exclude(
+            post__external_id__in=[p.external_id for p in posts]
+        ).exists()
+
+    def test_synchronize_posts_in_batches(self, posts, posts_payload) -> None:
+        """
+        Test that a batched PostSyncService inserts and updates every batch.
+        """
+        payload = posts_payload + [
+            {"userId": 1, "id": 3, "title": "Changed", "body": "Changed body"},
+            {"userId": 1, "id": 4, "title": "New", "body": "New body"},
+        ]
+        service = PostSyncService(batch_size=2)
+
+        with patch.object(service.handler_class, "list_items", return_value=payload):
+            inserted_count, updated_count = service._bulk_sync(
+                service.handler_class().list_items()
+            )
+
+        assert (inserted_count, updated_count) == (1, 3)
+        assert Post.objects.count() == 4
+        assert Post.objects.get(external_id=3).title == "Changed"
+        assert [len(batch) for batch in service._iter_batches(payload)] == [2, 2]
+
+    def test_synchronize_posts_skips_unchanged_rows(self, posts_payload) -> None:
+        """
+        Test that a resync only reads hashes and rewrites changed rows.
+        """
+        service = PostSyncService()
+        service._bulk_sync(posts_payload)
+
+        changed_payload = [
+            posts_payload[0],
+            {**posts_payload[1], "title": "Changed title"},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            inserted_count, updated_count = service._bulk_sync(changed_payload)
+
+        assert (inserted_count, updated_count) == (0, 1)
+        assert Post.objects.get(external_id=2).title == "Changed title"
+        select_sql = next(q["sql"] for q in queries if q["sql"].startswith("SELECT"))
+        assert '"content_post"."body"' not in select_sql
+        assert '"content_post"."content_hash"' in select_sql
+
+    def test_content_hash_matches_saved_post(self, posts_payload) -> None:
+        """
+        Test that posts saved outside the sync are not rewritten when equal.
+        """
+        item = posts_payload[0]
+        post = Post.objects.create(
+            external_id=item["id"], title=item["title"], body=item["body"]
+        )
+        assert post.content_hash
+
+        assert PostSyncService()._bulk_sync([item]) == (0, 0)
+
+    def test_synchronize_posts_with_upsert(self, posts_payload) -> None:
+        """
+        Test that the upsert strategy reports inserted, updated and skipped rows.
+        """
+        service = PostSyncService(write_strategy="upsert")
+
+        assert service._bulk_sync(posts_payload) == (2, 0)
+        assert service._bulk_sync(posts_payload) == (0, 0)
+
+        changed_payload = [
+            {**posts_payload[0], "body": "Changed body"},
+            posts_payload[1],
+            {"userId": 1, "id": 3, "title": "New", "body": "New body"},
+        ]
+        assert service._bulk_sync(changed_payload) == (1, 1)
+
+        post = Post.objects.get(external_id=1)
+        assert post.body == "Changed body"
+        assert post.user_id == 99999942
+        assert Post.objects.count() == 3
+
+    def test_upsert_statements_are_bounded(self, posts_payload) -> None:
+        """
+        Test that an unbatched upsert is split into bounded statements.
+        """
+        service = PostSyncService(write_strategy="upsert")
+        service.stream_batch_size = 1
+
+        with CaptureQueriesContext(connection) as queries:
+            assert service._bulk_sync(posts_payload) == (2, 0)
+
+        upserts = [q for q in queries if "ON CONFLICT" in q["sql"]]
+        assert len(upserts) == len(posts_payload)
+
+    def test_backfilled_hashes_match_synchronized_ones(
+        self, posts_payload, comments_payload
+    ) -> None:
+        """
+        Test that rows hashed by the content_hash backfill are not rewritten.
+        """
+        backfill = import_module(
+            "content.migrations.0005_backfill_content_hash"
+        ).backfill_content_hash
+        PostSyncService()._bulk_sync(posts_payload)
+        CommentSyncService()._bulk_sync(comments_payload)
+        Post.objects.update(content_hash="")
+        Comment.objects.update(content_hash="")
+
+        backfill(apps, None)
+
+        assert PostSyncService()._bulk_sync(posts_payload) == (0, 0)
+        assert CommentSyncService()._bulk_sync(comments_payload) == (0, 0)
+
+    def test_synchronize_comments_with_upsert(self, posts, comments_payload) -> None:
+        """
+        Test that the upsert strategy writes comments with resolved posts.
+        """
+        service = CommentSyncService(write_strategy="upsert")
+
+        assert service._bulk_sync(comments_payload) == (2, 0)
+        assert not Comment.objects.exclude(post=posts[0]).exists()
+
+    def test_bulk_load_posts(self, posts_payload) -> None:
+        """
+        Test that PostSyncService.bulk_load copies and merges posts.
+        """
+        payload = posts_payload + [
+            {"userId": 1, "id": 3, "title": "Tab\tand\\slash", "body": "Line\nbreak"}
+        ]
+        service = PostSyncService()
+
+        with patch.object(service.handler_class, "list_items", return_value=payload):
+            assert service.bulk_load() == (3, 0)
+            assert service.bulk_load() == (0, 0)
+
+        post = Post.objects.get(external_id=3)
+        assert (post.title, post.body) == ("Tab\tand\\slash", "Line\nbreak")
+        assert post.content_hash == service._build_object(3, payload[2]).content_hash
+
+    def test_bulk_load_comments(self, posts, comments_payload) -> None:
+        """
+        Test that CommentSyncService.bulk_load resolves posts and updates rows.
+        """
+        payload = [{**comments_payload[0], "body": "Changed"}, comments_payload[1]]
+        service = CommentSyncService()
+        service._bulk_sync(comments_payload)
+
+        with patch.object(service.handler_class, "list_items", return_value=payload):
+            assert service.bulk_load() == (0, 1)
+
+        assert Comment.objects.get(external_id=1).body == "Changed"
+        assert not Comment.objects.exclude(post=posts[0]).exists()
+
+    def test_synchronize_posts_from_paged_api(self, posts_payload) -> None:
+        """
+        Test that handler options reach the handler for paged fetching.
+        """
+        with StubApiServer({"posts": posts_payload}) as server:
+            PostSyncService(
+                handler_options={"endpoint": server.url, "page_size": 1}
+            ).synchronize()
+
+        assert Post.objects.count() == len(posts_payload)
+
+    def test_synchronize_posts_from_stream(self) -> None:
+        """
+        Test that a streamed response is consumed and written in batches.
+        """
+        payload = [
+            {"userId": 1, "id": i, "title": f"Post {i}", "body": "Body"}
+            for i in range(1, 251)
+        ]
+        service = PostSyncService(batch_size=100)
+
+        with StubApiServer({"posts": payload}) as server:
+            service.handler_options = {"endpoint": server.url, "stream": True}
+            service.synchronize()
+
+        assert service.fetched_count == len(payload)
+        assert Post.objects.count() == len(payload)
+
+    def test_lazy_items_are_batched_without_batch_size(self) -> None:
+        """
+        Test that a lazy source is consumed in bounded batches by default.
+        """
+        lazy_items = (
+            {"userId": 1, "id": i, "title": f"Post {i}", "body": "Body"}
+            for i in range(1, 6)
+        )
+        service = PostSyncService()
+        service.stream_batch_size = 2
+
+        batches = list(service._batches(lazy_items))
+
+        assert service.batch_size is None
+        assert [[item["id"] for item in batch] for batch in batches] == [
+            [1, 2],
+            [3, 4],
+            [5],
+        ]
+
+    def test_prefetch_reraises_fetch_errors(self, posts_payload) -> None:
+        """
+        Test that errors raised while streaming abort the sync.
+        """
+
+        def broken_stream():
+            yield from posts_payload
+            raise ValueError("broken stream")
+
+        service = PostSyncService(batch_size=1)
+
+        with pytest.raises(ValueError, match="broken stream"):
+            service._bulk_sync(broken_stream())
+
+        assert Post.objects.count() == len(posts_payload)
+
+    @pytest.mark.parametrize("stream", [False, True])
+    def test_synchronize_posts_short_circuits_when_not_modified(
+        self, posts_payload, stream
+    ) -> None:
+        """
+        Test that a second run sends If-None-Match and skips the sync on 304.
+        """
+        with StubApiServer({"posts": posts_payload}) as server:
+            service = PostSyncService(
+                handler_options={
+                    "endpoint": server.url,
+                    "stream": stream,
+                    "conditional": True,
+                }
+            )
+            assert service.synchronize() == (2, 0)
+            Post.objects.filter(external_id=1).update(title="Edited locally")
+
+            assert service.synchronize() == (0, 0)
+
+            assert "If-None-Match" not in server.requests[0].headers
+            assert server.requests[1].headers["If-None-Match"]
+
+        assert Post.objects.get(external_id=1).title == "Edited locally"
+
+    def test_synchronize_posts_short_circuits_on_same_digest(
+        self, posts_payload
+    ) -> None:
+        """
+        Test that an unchanged body without validators skips the sync.
+        """
+        response = MagicMock(status_code=200, headers={}, content=b"[]")
+        response.json.return_value = posts_payload
+        service = PostSyncService(handler_options={"conditional": True})
+
+        with patch.object(
+            service.handler_class, "_fetch_request_data", return_value=response
+        ):
+            assert service.synchronize() == (2, 0)
+            Post.objects.all().delete()
+            assert service.synchronize() == (0, 0)
+
+        assert not Post.objects.exists()
+
+    def test_validators_are_not_saved_when_sync_fails(self, posts_payload) -> None:
+        """
+        Test that a failed write does not make the next run skip the data.
+        """
+        with StubApiServer({"posts": posts_payload}) as server:
+            service = PostSyncService(
+                handler_options={"endpoint": server.url, "conditional": True}
+            )
+            with patch.object(service, "_bulk_sync", side_effect=ValueError("boom")):
+                with pytest.raises(ValueError):
+                    service.synchronize()
+
+            assert service.synchronize() == (2, 0)
+            assert "If-None-Match" not in server.requests[1].headers
@@ -0,0 +1,120 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from common.models import ApiValidators
+from common.testing import StubApiServer
+from content.models import Comment, Post
+from content.tasks import (
+    SYNC_LOCK_KEY,
+    build_resource_workflow,
+    check_workflow_backends,
+    synchronize_external_content_task,
+)
+from content.utils.services import CommentApiClient, PostApiClient
+
+
+@pytest.fixture
+def stub_api(posts_payload, comments_payload):
+    """
+    Serve the payloads from a stub server used by both API clients.
+    """
+    routes = {"posts": posts_payload, "comments": comments_payload}
+    with StubApiServer(routes) as server:
+        with patch.object(PostApiClient, "API_ENDPOINT", server.url), patch.object(
+            CommentApiClient, "API_ENDPOINT", server.url
+        ):
+            yield server
+
+
+@pytest.mark.django_db
+class TestSynchronizationTasks:
+    """
+    Tests for the Celery synchronization tasks, run eagerly without a broker.
+    """
+
+    def test_synchronize_external_content_task(self, stub_api) -> None:
+        """
+        Every page becomes a chunk task and the lock is released at the end.
+        """
+        result = synchronize_external_content_task.delay(page_size=1)
+
+        assert result.get() == {"status": "started"}
+        assert Post.objects.count() == 2
+        assert Comment.objects.filter(post__external_id=1).count() == 2
+        # One probe and one count request per resource, then one per page.
+        assert len(stub_api.requests) == 2 * 2 + 4
+        assert cache.get(SYNC_LOCK_KEY) is None
+        assert ApiValidators.objects.count() == 2
+
+    def test_unchanged_resources_are_skipped(self, stub_api) -> None:
+        """
+        Resources answered with a 304 by the probe are not fanned out again.
+        """
+        synchronize_external_content_task.delay(page_size=1)
+        Post.objects.filter(external_id=1).update(title="Edited locally")
+        requests = len(stub_api.requests)
+
+        result = synchronize_external_content_task.delay(page_size=1)
+
+        assert result.get() == {"status": "started"}
+        probes = stub_api.requests[requests:]
+        assert [request.path for request in probes] == ["/posts", "/comments"]
+        assert all(request.headers["If-None-Match"] for request in probes)
+        assert Post.objects.get(external_id=1).title == "Edited locally"
+        assert cache.get(SYNC_LOCK_KEY) is None
+
+    def test_chord_aggregates_counts(self, stub_api, posts_payload) -> None:
+        """
+        The chord callback sums the counts of all chunk tasks.
+        """
+        Post.objects.create(external_id=1, title="Old title", body="Old body")
+
+        result = build_resource_workflow("posts", page_size=1).apply()
+
+        assert result.get() == {"resource": "posts", "inserted": 1, "updated": 1}
+
+    def test_overlapping_run_is_skipped(self, stub_api) -> None:
+        """
+        A run does nothing while another one holds the lock.
+        """
+        cache.set(SYNC_LOCK_KEY, "other-run")
+
+        result = synchronize_external_content_task.delay()
+
+        assert result.get() == {"status": "skipped"}
+        assert not stub_api.requests
+        assert cache.get(SYNC_LOCK_KEY) == "other-run"
+
+    @override_settings(
+        CELERY_TASK_ALWAYS_EAGER=False,
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+    )
+    def test_process_local_lock_cache_is_rejected(self) -> None:
+        """
+        Workers cannot share a lock held in a per-process cache.
+        """
+        with pytest.raises(ImproperlyConfigured, match="CACHE_URL"):
+            check_workflow_backends()
+
+    @override_settings(
+        CELERY_TASK_ALWAYS_EAGER=False,
+        CELERY_RESULT_BACKEND=None,
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": "/tmp/content-sync-lock-test",
+            }
+        },
+    )
+    def test_missing_result_backend_is_rejected(self) -> None:
+        """
+        Chords cannot complete without a result backend.
+        """
+        with pytest.raises(ImproperlyConfigured, match="CELERY_RESULT_BACKEND"):
+            check_workflow_backends()
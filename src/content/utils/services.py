@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional
 
 from common.services import FakeApiRequestsHandler
 
@@ -11,20 +11,56 @@ class PostApiClient(FakeApiRequestsHandler):
     Handler to fetch posts from JSONPlaceholder.
     """
 
-    def list_items(self) -> List[Dict]:
+    def list_items(self) -> Iterable[Dict]:
         """
         Retrieve all posts from the API.
         """
         return self._list_from_endpoint("posts")
 
+    def list_page(self, page: int) -> List[Dict]:
+        """
+        Retrieve a single page of posts from the API.
+        """
+        return self._page_from_endpoint("posts", page)
+
+    def count_items(self) -> Optional[int]:
+        """
+        Retrieve the total number of posts available in the API.
+        """
+        return self._count_from_endpoint("posts")
+
+    def probe_items(self) -> bool:
+        """
+        Check whether the posts changed since the last synchronization.
+        """
+        return self._probe_endpoint("posts")
+
 
 class CommentApiClient(FakeApiRequestsHandler):
     """
     Handler to fetch comments from JSONPlaceholder.
     """
 
-    def list_items(self) -> List[Dict]:
+    def list_items(self) -> Iterable[Dict]:
         """
         Retrieve all comments from the API.
         """
         return self._list_from_endpoint("comments")
+
+    def list_page(self, page: int) -> List[Dict]:
+        """
+        Retrieve a single page of comments from the API.
+        """
+        return self._page_from_endpoint("comments", page)
+
+    def count_items(self) -> Optional[int]:
+        """
+        Retrieve the total number of comments available in the API.
+        """
+        return self._count_from_endpoint("comments")
+
+    def probe_items(self) -> bool:
+        """
+        Check whether the comments changed since the last synchronization.
+        """
+        return self._probe_endpoint("comments")
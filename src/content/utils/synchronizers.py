@@ -1,3 +1,5 @@
+from typing import Any, Dict, List
+
 from common.synchronizers import BaseSyncService
 from content.models import Comment, Post
 from content.utils.services import CommentApiClient, PostApiClient
@@ -28,33 +30,42 @@ class CommentSyncService(BaseSyncService):
 
     model = Comment
     handler_class = CommentApiClient
+    post_lookup_chunk_size: int = 10000
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.post_ids: Dict[int, int] = {}
+
+    def preload(self, api_data: List[Dict[str, Any]]) -> None:
+        """
+        Build an external_id -> pk map for every Post referenced by the items.
+        """
+        external_ids = sorted(
+            {item["postId"] for item in api_data if item.get("postId")}
+        )
+        self.post_ids = {}
+        for start in range(0, len(external_ids), self.post_lookup_chunk_size):
+            chunk = external_ids[start : start + self.post_lookup_chunk_size]
+            self.post_ids.update(
+                Post.objects.filter(external_id__in=chunk).values_list(
+                    "external_id", "id"
+                )
+            )
 
     def map_fields(self, item: dict) -> dict:
         """
         Map fields from the API response to the model fields.
         """
-        post = None
-        post_id = item.get("postId")
-        if post_id:
-            post = Post.objects.filter(external_id=post_id).first()
-
         return {
             "name": item.get("name", ""),
             "email": item.get("email", ""),
             "body": item.get("body", ""),
-            "post": post,
+            "post_id": self.post_ids.get(item.get("postId")),
         }
 
 
-def synchronize_posts_task() -> None:
-    """
-    Synchronize posts from an external API into the local database.
-    """
-    PostSyncService().synchronize()
-
-
-def synchronize_comments_task() -> None:
-    """
-    Synchronize comments from an external API into the local database.
-    """
-    CommentSyncService().synchronize()
+# Resources in dependency order: comments reference posts.
+SYNC_SERVICES: Dict[str, type[BaseSyncService]] = {
+    "posts": PostSyncService,
+    "comments": CommentSyncService,
+}
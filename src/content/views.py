@@ -1,12 +1,28 @@
+from django.db.models import Prefetch
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 
+from common.filters import FullTextSearchFilter
+from common.pagination import KeysetPagination
+from common.views import (
+    BulkWriteMixin,
+    ConditionalResponseMixin,
+    ExportMixin,
+    ProfiledAuthenticationMixin,
+)
+
 from .models import Comment, Post
-from .serializers import CommentSerializer, PostSerializer
+from .serializers import CommentSerializer, PostSerializer, PostWithCommentsSerializer
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(
+    ProfiledAuthenticationMixin,
+    ConditionalResponseMixin,
+    BulkWriteMixin,
+    ExportMixin,
+    viewsets.ModelViewSet,
+):
     """
     CRUD for Posts, including synchronization with external API.
     """
@@ -14,11 +30,65 @@ class PostViewSet(viewsets.ModelViewSet):
     serializer_class = PostSerializer
     queryset = Post.objects.all().order_by("external_id")
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
+    search_vector_field = "search_vector"
     filterset_fields = ["external_id", "user_id"]
+    # Comments embedded per post with ?include=comments.
+    included_comments_limit = 10
+
+    def includes_comments(self) -> bool:
+        """
+        Return whether the request asks to embed the comments of each post.
+        """
+        if getattr(self, "action", None) not in ("list", "retrieve"):
+            return False
+        include = self.request.query_params.get("include", "")
+        return "comments" in include.split(",")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.includes_comments():
+            comments = Comment.objects.order_by("external_id", "id")
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "comments",
+                    queryset=comments[: self.included_comments_limit],
+                    to_attr="included_comments",
+                )
+            )
+        return queryset
+
+    def get_serializer_class(self):
+        if self.includes_comments():
+            return PostWithCommentsSerializer
+        return super().get_serializer_class()
+
+    def use_values_list(self) -> bool:
+        return not self.includes_comments()
+
+    def get_cache_dependencies(self):
+        dependencies = super().get_cache_dependencies()
+        if self.includes_comments():
+            dependencies = (*dependencies, Comment)
+        return dependencies
+
+    def get_validator_querysets(self, queryset):
+        # Only detail responses use these; list ETags follow the Comment
+        # cache version, as they depend on Comment.
+        querysets = super().get_validator_querysets(queryset)
+        if self.includes_comments():
+            querysets.append(Comment.objects.filter(post_id__in=queryset.values("pk")))
+        return querysets
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ProfiledAuthenticationMixin,
+    ConditionalResponseMixin,
+    BulkWriteMixin,
+    ExportMixin,
+    viewsets.ModelViewSet,
+):
     """
     CRUD for Comments, including synchronization with external API.
     """
@@ -26,5 +96,9 @@ class CommentViewSet(viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     queryset = Comment.objects.all().order_by("external_id")
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
+    search_vector_field = "search_vector"
     filterset_fields = ["external_id", "post"]
+    # Deleting a post cascades to its comments.
+    cache_dependencies = (Post,)
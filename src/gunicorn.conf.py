@@ -0,0 +1,36 @@
+"""
+Gunicorn configuration: `gunicorn -c gunicorn.conf.py` from `src/`.
+
+Every worker writes its Prometheus samples to memory-mapped files of
+PROMETHEUS_MULTIPROC_DIR, which /metrics/ aggregates. The variable must be
+set before prometheus_client is first imported, so it is set here and the
+library is only imported inside the hooks.
+"""
+
+import os
+import shutil
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-multiproc")
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", 4))
+wsgi_app = "backend.wsgi:application"
+
+
+def on_starting(server) -> None:
+    """
+    Start from an empty metrics directory, dropping samples of previous runs.
+    """
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+
+
+def child_exit(server, worker) -> None:
+    """
+    Drop the live gauges of an exited worker; its counters and histograms
+    keep counting in the totals.
+    """
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)